@@ -0,0 +1,62 @@
+"""
+Micro-benchmark of clean_dataframe across column counts.
+
+Compares the current normalizer with the previous per-cell string
+implementation (kept here as the baseline). Usage:
+
+    python benchmarks/bench_clean.py --rows 50000 --columns 10 50 150
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.compare import clean_dataframe
+from synthetic import make_pta_frame
+
+
+def legacy_clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """clean_dataframe before the single-pass rewrite."""
+    df = df.copy()
+    for col in df.columns:
+        s = df[col]
+        if s.dropna().astype(str).str.upper().isin({'X'}).all():
+            df[col] = s.astype(str).str.upper().eq('X').astype(int)
+        elif pd.api.types.is_object_dtype(s):
+            df[col] = s.fillna('').astype(str).str.strip().str.lower()
+        else:
+            df[col] = s.fillna(0)
+    return df
+
+
+def _best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 50, 150])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'legacy s':>10} {'current s':>10} {'speedup':>8}")
+    for n_columns in args.columns:
+        df = make_pta_frame(args.rows, option_columns=n_columns)
+        pd.testing.assert_frame_equal(legacy_clean_dataframe(df), clean_dataframe(df))
+        legacy = _best_of(legacy_clean_dataframe, df, args.repeat)
+        current = _best_of(clean_dataframe, df, args.repeat)
+        print(f"{df.shape[1]:>8} {legacy:>10.3f} {current:>10.3f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Parse time and peak RSS of the PTA reader backends.
+
+Each backend runs in a fresh process so its peak RSS is not polluted by the
+others. Usage:
+
+    python benchmarks/bench_ingest.py --rows 20000 --options 60
+"""
+import argparse
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from synthetic import make_pta_frame, write_pta_workbook
+
+
+def _run_backend(path: str, reader: str) -> dict:
+    from core.ingest import read_pta
+
+    data = Path(path).read_bytes()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    df = read_pta(data, reader)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "reader": reader,
+        "seconds": round(elapsed, 3),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_delta_mb": round((rss_after - rss_before) / 1024, 1),
+        "shape": df.shape,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--options", type=int, default=60)
+    parser.add_argument("--readers", nargs="+", default=["pandas", "openpyxl", "xml"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_pta_workbook(make_pta_frame(args.rows, option_columns=args.options), Path(tmp) / "pta.xlsx")
+        print(f"{args.rows} rows x {args.options} option columns, {path.stat().st_size / 1024 ** 2:.1f} MB")
+        for reader in args.readers:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(_run_backend, str(path), reader).result()
+            print(f"{result['reader']:>10}: {result['seconds']:>8.3f} s  peak RSS +{result['peak_rss_delta_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
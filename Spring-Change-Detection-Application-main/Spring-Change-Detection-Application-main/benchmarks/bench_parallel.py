@@ -0,0 +1,45 @@
+"""
+Scaling of the parallel comparison engine from 1 to N worker processes.
+
+Usage:
+
+    python benchmarks/bench_parallel.py --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.compare import generate_results_df, generate_results_parallel
+from synthetic import make_pta_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--options", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    old_df = make_pta_frame(args.rows, option_columns=args.options, seed=0)
+    new_df = make_pta_frame(args.rows, option_columns=args.options, seed=1)
+    print(f"{args.rows} rows per side, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    generate_results_df(old_df, new_df, "VP")
+    single = time.perf_counter() - start
+    print(f"{'in-memory':>10}: {single:8.2f} s")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        generate_results_parallel(old_df, new_df, "VP", max_workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>3} worker: {elapsed:8.2f} s  ({single / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark suite of the processing pipeline, results stored as JSON.
+
+For every size a synthetic old/new PTA pair is generated (see
+synthetic.make_pta_pair) and each stage is timed on it:
+
+    ingest    parse and validate the new workbook (core.ingest)
+    clean     clean_dataframe on the old revision
+    compare   generate_results with the configured engine
+    display   build_display_view of the results page
+    export    create_report, the highlighted workbook
+
+Usage:
+
+    python benchmarks/run.py --rows 10000 100000 1000000
+    python benchmarks/run.py --rows 10000 --stages compare export --baseline old.json
+
+Writing the xlsx inputs of the ingest and export stages dominates the setup
+of the large sizes; pass --workdir to keep them for the next runs.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.compare import build_display_view, clean_dataframe, generate_results
+from core.export import create_report
+from core.ingest import parse_and_validate, projection
+from synthetic import make_pta_pair, write_pta_workbook
+from utils import profiling
+
+STAGES = ["ingest", "clean", "compare", "display", "export"]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _environment() -> Dict[str, Any]:
+    """Versions and machine the results were measured with."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _measure(name: str, func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Run a stage `repeat` times inside a profiling stage.
+
+    Returns:
+        Best and every timing of the stage, plus the sub-stage breakdown
+        (and memory, when traced) of the fastest run.
+    """
+    timings, records = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with profiling.stage(name) as record:
+            func()
+        timings.append(round(time.perf_counter() - start, 6))
+        # record is None when PROFILING_CONFIG disables the stage profiler
+        records.append(record or {"children": []})
+    best = int(np.argmin(timings))
+    result = {
+        "stage": name,
+        "seconds": timings[best],
+        "runs": timings,
+        "stages": records[best]["children"],
+    }
+    if "peak_memory_bytes" in records[best]:
+        result["peak_memory_bytes"] = records[best]["peak_memory_bytes"]
+    return result
+
+
+def _workbook(df: pd.DataFrame, workdir: Path, name: str) -> bytes:
+    """Bytes of the PTA workbook of a frame, written once per workdir."""
+    path = workdir / f"{name}.xlsx"
+    if not path.exists():
+        write_pta_workbook(df, path)
+    return path.read_bytes()
+
+
+def run_size(rows: int, args: argparse.Namespace, workdir: Path) -> List[Dict[str, Any]]:
+    """Benchmark every selected stage on one generated pair."""
+    old, new = make_pta_pair(
+        rows, args.pta_type, args.options,
+        duplicate_rate=args.duplicate_rate, change_rate=args.change_rate, seed=args.seed
+    )
+    name = (f"{args.pta_type}_{rows}_o{args.options}_d{args.duplicate_rate}"
+            f"_c{args.change_rate}_s{args.seed}")
+    new_bytes = None
+    if "ingest" in args.stages or "export" in args.stages:
+        new_bytes = _workbook(new, workdir, f"{name}_new")
+
+    results = generate_results(old, new, args.pta_type)
+    display = build_display_view(results, new)
+    columns = projection(args.pta_type)
+    stages = {
+        "ingest": lambda: parse_and_validate(new_bytes, columns),
+        "clean": lambda: clean_dataframe(old),
+        "compare": lambda: generate_results(old, new, args.pta_type),
+        "display": lambda: build_display_view(results, new),
+        "export": lambda: create_report(new_bytes, display),
+    }
+
+    measured = []
+    for stage_name in args.stages:
+        result = _measure(stage_name, stages[stage_name], args.repeat)
+        result.update(rows=rows, pta_type=args.pta_type)
+        measured.append(result)
+        print(f"{rows:>9} {stage_name:>8}: {result['seconds']:>9.3f} s")
+    return measured
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print the ratio of every timing to the same size and stage of a baseline file."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    previous = {
+        (entry["rows"], entry["pta_type"], entry["stage"]): entry["seconds"]
+        for entry in baseline["results"]
+    }
+    print(f"\nAgainst {baseline_path} ({baseline['environment'].get('commit')}):")
+    for entry in results:
+        before = previous.get((entry["rows"], entry["pta_type"], entry["stage"]))
+        if before is None:
+            continue
+        print(f"{entry['rows']:>9} {entry['stage']:>8}: {before:>9.3f} s -> "
+              f"{entry['seconds']:>9.3f} s  ({entry['seconds'] / before:.2f}x)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--pta-type", choices=["VP", "VU"], default="VP")
+    parser.add_argument("--options", type=int, default=20, help="option columns per sheet")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the best one is kept")
+    parser.add_argument("--trace-memory", action="store_true", help="record peak memory (slower)")
+    parser.add_argument("--workdir", help="keep the generated workbooks here")
+    parser.add_argument("--output", help="JSON file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous JSON results to compare with")
+    args = parser.parse_args(argv)
+
+    profiling.set_trace_memory(args.trace_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for rows in args.rows:
+            results.extend(run_size(rows, args, workdir))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "parameters": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline", "workdir")
+        },
+        "results": results,
+    }
+    output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
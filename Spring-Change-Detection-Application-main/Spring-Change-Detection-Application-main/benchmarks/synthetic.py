@@ -0,0 +1,153 @@
+"""
+Synthetic PTA workbooks for the benchmarks.
+
+Builds VP/VU PTA sheets with the configured key and required columns plus
+filler option columns, laid out like the real files (header row, one
+skipped row, then data), and old/new revision pairs with a controlled
+duplicate-key, change, added and removed rate.
+"""
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import REQUIRED_COLUMNS, UPLOAD_CONFIG, VP_COLUMNS_KEY, VU_COLUMNS_KEY
+
+
+def _key_columns(key_ids: np.ndarray, pta_type: str, rng: np.random.Generator) -> dict:
+    """
+    Key column values encoding each key id: the first three keys (Moteur,
+    Boite, Niveau) spell the id in a mixed radix so distinct ids never
+    collide, the other keys are checkbox columns drawn per key id.
+    """
+    keys = VP_COLUMNS_KEY if pta_type == "VP" else VU_COLUMNS_KEY
+    n_ids = int(key_ids.max()) + 1 if len(key_ids) else 0
+    radix = (
+        [f"{keys[0][:3]} {j}" for j in range(64)],
+        [f"{keys[1][:3]} {j}" for j in range(16)],
+    )
+    data = {
+        keys[0]: np.array(radix[0], dtype=object)[key_ids % 64],
+        keys[1]: np.array(radix[1], dtype=object)[(key_ids // 64) % 16],
+        keys[2]: np.char.add(f"{keys[2][:3]} ", (key_ids // 1024).astype(str)).astype(object),
+    }
+    for key in keys[3:]:
+        per_id = rng.choice(np.array(["X", None], dtype=object), n_ids)
+        data[key] = per_id[key_ids]
+    return data
+
+
+def make_pta_frame(
+    rows: int,
+    pta_type: str = "VP",
+    option_columns: int = 20,
+    seed: int = 0,
+    duplicate_rate: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Random PTA DataFrame with key, reference, mass and option columns.
+
+    Args:
+        rows: Number of vehicle rows.
+        pta_type: "VP" or "VU", selects the key columns.
+        option_columns: Number of extra checkbox/text option columns.
+        seed: Random seed.
+        duplicate_rate: Share of rows repeating the composite key of another
+            row. None draws every key column independently from a small
+            vocabulary (many duplicates).
+
+    Returns:
+        The synthetic PTA DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    keys = VP_COLUMNS_KEY if pta_type == "VP" else VU_COLUMNS_KEY
+    data = {}
+    if duplicate_rate is None:
+        for i, key in enumerate(keys):
+            if i < 3:
+                data[key] = rng.choice([f"{key[:3]} {j}" for j in range(8)], rows)
+            else:
+                data[key] = rng.choice(np.array(["X", None], dtype=object), rows)
+    else:
+        n_unique = max(1, rows - int(round(rows * duplicate_rate)))
+        key_ids = np.concatenate([
+            np.arange(n_unique),
+            rng.integers(0, n_unique, rows - n_unique),
+        ])
+        key_ids.sort()
+        data.update(_key_columns(key_ids, pta_type, rng))
+    data[REQUIRED_COLUMNS["mass"]] = rng.integers(900, 1600, rows).astype(float)
+    data[REQUIRED_COLUMNS["reference"]] = rng.integers(100000, 100050, rows)
+    for j in range(option_columns):
+        if j % 2:
+            data[f"Option {j}"] = rng.choice(np.array(["X", None], dtype=object), rows)
+        else:
+            data[f"Option {j}"] = rng.choice(np.array(["Code A", "Code B", None], dtype=object), rows)
+    return pd.DataFrame(data)
+
+
+def make_pta_pair(
+    rows: int,
+    pta_type: str = "VP",
+    option_columns: int = 20,
+    duplicate_rate: float = 0.05,
+    change_rate: float = 0.1,
+    added_rate: float = 0.02,
+    removed_rate: float = 0.02,
+    seed: int = 0
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Old and new revisions of one PTA, the new one derived from the old.
+
+    Args:
+        rows: Number of vehicle rows of the old revision.
+        pta_type: "VP" or "VU".
+        option_columns: Number of extra option columns.
+        duplicate_rate: Share of rows repeating the key of another row.
+        change_rate: Share of the kept rows whose spring reference (and
+            mass) changes, reported as 'Spring Changed'.
+        added_rate: New cars appended to the new revision, as a share of rows
+            ('New').
+        removed_rate: Share of the old rows missing from the new revision.
+        seed: Random seed.
+
+    Returns:
+        (old, new) PTA DataFrames.
+    """
+    rng = np.random.default_rng(seed)
+    old = make_pta_frame(rows, pta_type, option_columns, seed, duplicate_rate)
+
+    kept = np.sort(rng.choice(rows, rows - int(round(rows * removed_rate)), replace=False))
+    new = old.iloc[kept].reset_index(drop=True)
+    changed = rng.random(len(new)) < change_rate
+    reference, mass = REQUIRED_COLUMNS["reference"], REQUIRED_COLUMNS["mass"]
+    new.loc[changed, reference] = new.loc[changed, reference] + 1000
+    new.loc[changed, mass] = new.loc[changed, mass] + rng.integers(-40, 41, int(changed.sum()))
+
+    n_added = int(round(rows * added_rate))
+    if n_added:
+        added = make_pta_frame(n_added, pta_type, option_columns, seed + 1, duplicate_rate=0.0)
+        # key ids past the old ones: Niveau values the old revision never uses
+        keys = VP_COLUMNS_KEY if pta_type == "VP" else VU_COLUMNS_KEY
+        added[keys[2]] = "new " + added[keys[2]]
+        new = pd.concat([new, added], ignore_index=True)
+    return old, new
+
+
+def write_pta_workbook(df: pd.DataFrame, path: Path) -> Path:
+    """Write a DataFrame as the PTA sheet of an xlsx file (streaming writer)."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(UPLOAD_CONFIG["sheet_name"])
+    ws.append(list(df.columns))
+    # the row skipped by UPLOAD_CONFIG["skip_rows"]
+    ws.append(["" for _ in df.columns])
+    for row in df.itertuples(index=False):
+        ws.append([None if isinstance(v, float) and v != v else v for v in row])
+    wb.save(path)
+    return Path(path)
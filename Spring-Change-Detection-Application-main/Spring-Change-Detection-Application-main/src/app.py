@@ -1,14 +1,13 @@
 import streamlit as st
 
-from config import PAGE_TITLE, PAGE_ICON, PAGE_LAYOUT, INITIAL_SIDEBAR_STATE
-from ui.sidebar import render_sidebare
+from config import PAGE_TITLE, PAGE_ICON, PAGE_LAYOUT, INITIAL_SIDEBAR_STATE, PROFILING_CONFIG
+from ui.sidebar import render_sidebare, render_diagnostics
 from ui.uploads import render_upload_section
-from ui.analysis import render_analysis
+from ui.analysis import render_analysis, compute_results
 from ui.results import Result
 from utils.session_state import SessionStateManager
 from ui.styles import STYLES
 import streamlit.components.v1 as com
-from data_processing import generate_results_df
 
 def render_hero_section():
     # project title
@@ -155,18 +154,21 @@ def main():
     
     old_df = st.session_state.get('input_excel_old')
     new_df = st.session_state.get('input_excel_new')
-    pta_type = st.session_state.get('pta_type')
     
     # Create result dataframe only if both files are uploaded
     if (old_df is not None and 
         new_df is not None):
         try:
-            generate_results_df(old_df,new_df,pta_type)
+            st.session_state['results'] = compute_results()
         except Exception as e:
             st.error(f"Error creating result dataframe: {str(e)}")
     
     # Render main content
     render_main_content()
+
+    # Stage timings of this run and the previous ones
+    if PROFILING_CONFIG["show_panel"]:
+        render_diagnostics()
     
     # Footer
     st.markdown("""
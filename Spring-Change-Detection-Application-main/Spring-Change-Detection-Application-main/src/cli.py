@@ -0,0 +1,323 @@
+"""
+Headless command line runner: compare PTA revisions without Streamlit and
+write the highlighted Excel reports plus a JSON summary.
+
+Usage:
+    python src/cli.py compare OLD.xlsx NEW.xlsx --pta-type VP --output out/
+    python src/cli.py batch pairs_dir/ --pta-type VU --output out/ --workers 4
+    python src/cli.py history rev1.xlsx rev2.xlsx rev3.xlsx --pta-type VP --output out/
+    python src/cli.py history revisions_dir/ --pta-type VP --output out/
+
+In batch mode every '<name>_old.xlsx' of the directory is paired with
+'<name>_new.xlsx' (suffixes set in CLI_CONFIG) and the pairs are compared
+in a process pool, one pair per worker.
+
+History mode traces a chain of revisions (given in order, or every workbook
+of a directory sorted by name): each workbook is parsed and prepared once,
+then all revisions are aligned in one pass (see core.history).
+"""
+#__TODO: import libraries_______________________________________________
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import CLI_CONFIG, COMPARISON_CONFIG, UPLOAD_CONFIG
+from core.compare import PreparedSide, generate_results, prepare_side
+from core.export import create_report
+from core.history import generate_history_prepared, summarize_history
+from core.ingest import projection, read_bytes, validate_excel_file
+from utils.profiling import stage
+
+
+#__TODO: Compare one pair_______________________________________________
+def run_pair(
+    name: str,
+    old_path: Optional[str],
+    new_path: Optional[str],
+    pta_type: str,
+    output_dir: str,
+    parallel: bool = False
+) -> Dict[str, Any]:
+    """
+    Compare one old/new pair and write its highlighted report.
+
+    Args:
+        name: Name of the pair, used for the report file name.
+        old_path: Old PTA workbook (None when the pair is incomplete).
+        new_path: New PTA workbook (None when the pair is incomplete).
+        pta_type: Either "VP" or "VU".
+        output_dir: Directory receiving the report.
+        parallel: Use the multi-core engine for this pair.
+
+    Returns:
+        Summary of the pair: status, counts per change/mass status and
+        report path, or the error message, plus the timing of every stage
+        when profiling is enabled.
+    """
+    summary: Dict[str, Any] = {
+        "name": name, "old": old_path, "new": new_path, "pta_type": pta_type
+    }
+    start = time.perf_counter()
+    try:
+        with stage("pair") as run:
+            if old_path is None or new_path is None:
+                raise ValueError("incomplete pair: missing old or new file")
+
+            columns = projection(pta_type)
+            frames = {}
+            for label, path in (("old", old_path), ("new", new_path)):
+                valid, message, df = validate_excel_file(path, label, columns)
+                if not valid:
+                    raise ValueError(message)
+                frames[label] = df
+
+            result_df = generate_results(frames["old"], frames["new"], pta_type, parallel=parallel)
+
+            report_path = Path(output_dir) / f"{name}{CLI_CONFIG['report_suffix']}"
+            report_path.write_bytes(create_report(read_bytes(new_path), result_df))
+
+        summary.update(
+            status="ok",
+            report=str(report_path),
+            rows=len(result_df),
+            change_types={k: int(v) for k, v in result_df["Change Type"].value_counts().items()},
+            mass_status={k: int(v) for k, v in result_df["Mass Status"].value_counts().items()},
+        )
+    except Exception as e:
+        summary.update(status="error", error=str(e))
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    if run is not None:
+        summary["stages"] = run["children"]
+    return summary
+
+
+#__TODO: Find the pairs of a directory_______________________________________________
+def find_pairs(directory: str) -> List[Dict[str, Optional[str]]]:
+    """
+    Pair '<name><old suffix>.<ext>' with '<name><new suffix>.<ext>' files.
+
+    Returns:
+        One {'name', 'old', 'new'} entry per name, sorted by name; 'old' or
+        'new' is None when its counterpart is missing.
+    """
+    pairs: Dict[str, Dict[str, Optional[str]]] = {}
+    extensions = {f".{ext}" for ext in UPLOAD_CONFIG["allowed_extension"]}
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in extensions or path.name.startswith("~$"):
+            continue
+        for side in ("old", "new"):
+            suffix = CLI_CONFIG[f"{side}_suffix"]
+            if path.stem.endswith(suffix):
+                name = path.stem[:-len(suffix)]
+                pairs.setdefault(name, {"name": name, "old": None, "new": None})[side] = str(path)
+    return [pairs[name] for name in sorted(pairs)]
+
+
+#__TODO: Run the jobs_______________________________________________
+def run_batch(
+    pairs: List[Dict[str, Optional[str]]],
+    pta_type: str,
+    output_dir: str,
+    max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compare every pair, one pair per worker process.
+
+    A single pair (or max_workers=1) runs in this process; its comparison
+    then uses the multi-core engine if COMPARISON_CONFIG enables it.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    if len(pairs) <= 1 or max_workers == 1:
+        return [
+            run_pair(pair["name"], pair["old"], pair["new"], pta_type, output_dir,
+                     parallel=COMPARISON_CONFIG["parallel"])
+            for pair in pairs
+        ]
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context(COMPARISON_CONFIG["start_method"])
+    ) as pool:
+        futures = [
+            pool.submit(run_pair, pair["name"], pair["old"], pair["new"], pta_type, output_dir)
+            for pair in pairs
+        ]
+        return [future.result() for future in futures]
+
+
+def write_summary(summaries: List[Dict[str, Any]], output_dir: str, pta_type: str) -> Path:
+    """Write the machine-readable summary of a run next to the reports."""
+    path = Path(output_dir) / CLI_CONFIG["summary_name"]
+    payload = {
+        "pta_type": pta_type,
+        "pairs": summaries,
+        "failed": sum(summary["status"] != "ok" for summary in summaries),
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+#__TODO: History of a chain of revisions_______________________________________________
+def find_revisions(paths: List[str]) -> List[str]:
+    """The revision workbooks: the given files, or the workbooks of a single directory sorted by name."""
+    if len(paths) == 1 and Path(paths[0]).is_dir():
+        extensions = {f".{ext}" for ext in UPLOAD_CONFIG["allowed_extension"]}
+        return [
+            str(path) for path in sorted(Path(paths[0]).iterdir())
+            if path.suffix.lower() in extensions and not path.name.startswith("~$")
+        ]
+    return list(paths)
+
+
+def load_revision(path: str, pta_type: str) -> PreparedSide:
+    """Parse, validate and prepare one revision (runs in a worker process)."""
+    valid, message, df = validate_excel_file(path, "revision", projection(pta_type))
+    if not valid:
+        raise ValueError(f"{path}: {message}")
+    return prepare_side(df, pta_type, "new")
+
+
+def load_revisions(
+    paths: List[str], pta_type: str, max_workers: Optional[int] = None
+) -> List[PreparedSide]:
+    """Prepare every revision once, one workbook per worker process."""
+    if len(paths) <= 1 or max_workers == 1:
+        return [load_revision(path, pta_type) for path in paths]
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context(COMPARISON_CONFIG["start_method"])
+    ) as pool:
+        futures = [pool.submit(load_revision, path, pta_type) for path in paths]
+        return [future.result() for future in futures]
+
+
+def run_history(
+    paths: List[str],
+    pta_type: str,
+    output_dir: str,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Trace a chain of revisions and write its changes and configurations.
+
+    Args:
+        paths: Revision workbooks in chronological order.
+        pta_type: Either "VP" or "VU".
+        output_dir: Directory receiving the CSV files and the summary.
+        max_workers: Worker processes parsing the workbooks.
+
+    Returns:
+        Summary of the run: revisions, counts per revision and change type,
+        output paths and the timing of every stage when profiling is enabled.
+    """
+    if len(paths) < 2:
+        raise ValueError("history needs at least two revisions")
+    start = time.perf_counter()
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    labels = [Path(path).stem for path in paths]
+
+    with stage("history_run") as run:
+        sides = load_revisions(paths, pta_type, max_workers)
+        changes = generate_history_prepared(sides, pta_type, labels)
+        configurations = summarize_history(changes)
+
+        changes_path = output / CLI_CONFIG["history_changes_name"]
+        configurations_path = output / CLI_CONFIG["history_configurations_name"]
+        changes.to_csv(changes_path, index=False)
+        configurations.to_csv(configurations_path, index=False)
+
+    counts = changes.groupby(['Revision', 'Change Type'], sort=False).size()
+    summary: Dict[str, Any] = {
+        "pta_type": pta_type,
+        "revisions": [{"name": label, "path": path} for label, path in zip(labels, paths)],
+        "changes": {
+            label: {k: int(v) for k, v in counts[label].items()} if label in counts.index else {}
+            for label in labels[1:]
+        },
+        "configurations_changed": len(configurations),
+        "changes_csv": str(changes_path),
+        "configurations_csv": str(configurations_path),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    if run is not None:
+        summary["stages"] = run["children"]
+    return summary
+
+
+#__TODO: Command line_______________________________________________
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare PTA Excel revisions and write highlighted reports."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compare = commands.add_parser("compare", help="compare one old/new pair")
+    compare.add_argument("old", help="old PTA workbook")
+    compare.add_argument("new", help="new PTA workbook")
+
+    batch = commands.add_parser("batch", help="compare every <name>_old/<name>_new pair of a directory")
+    batch.add_argument("directory", help="directory holding the pairs")
+    batch.add_argument("-j", "--workers", type=int, default=None,
+                       help="worker processes (default: one per CPU)")
+
+    history = commands.add_parser("history", help="trace the changes of every car across a chain of revisions")
+    history.add_argument("revisions", nargs="+",
+                         help="revision workbooks in chronological order, or one directory of them (sorted by name)")
+    history.add_argument("-j", "--workers", type=int, default=None,
+                         help="worker processes parsing the workbooks (default: one per CPU)")
+
+    for command in (compare, batch, history):
+        command.add_argument("-t", "--pta-type", choices=["VP", "VU"], default="VP")
+        command.add_argument("-o", "--output", default=CLI_CONFIG["output_dir"],
+                             help="directory receiving the reports and the summary")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "history":
+        paths = find_revisions(args.revisions)
+        try:
+            summary = run_history(paths, args.pta_type, args.output, args.workers)
+        except Exception as e:
+            print(f"[error] history: {e}", file=sys.stderr)
+            return 1
+        summary_path = Path(args.output) / CLI_CONFIG["history_summary_name"]
+        summary_path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+        for label, counts in summary["changes"].items():
+            print(f"[ok] {label}: " + ", ".join(f"{k}: {v}" for k, v in counts.items()))
+        print(f"Changes written to {summary['changes_csv']}")
+        print(f"Summary written to {summary_path}")
+        return 0
+
+    if args.command == "compare":
+        name = Path(args.new).stem
+        pairs = [{"name": name, "old": args.old, "new": args.new}]
+        summaries = run_batch(pairs, args.pta_type, args.output)
+    else:
+        pairs = find_pairs(args.directory)
+        if not pairs:
+            print(f"No PTA pairs found in '{args.directory}'.", file=sys.stderr)
+            return 1
+        summaries = run_batch(pairs, args.pta_type, args.output, args.workers)
+
+    summary_path = write_summary(summaries, args.output, args.pta_type)
+    for summary in summaries:
+        if summary["status"] == "ok":
+            counts = ", ".join(f"{k}: {v}" for k, v in summary["change_types"].items())
+            print(f"[ok] {summary['name']} ({summary['seconds']} s) {counts}")
+        else:
+            print(f"[error] {summary['name']}: {summary['error']}", file=sys.stderr)
+    print(f"Summary written to {summary_path}")
+    return 1 if any(summary["status"] != "ok" for summary in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
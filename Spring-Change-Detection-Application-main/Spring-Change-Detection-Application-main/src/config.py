@@ -14,7 +14,83 @@ UPLOAD_CONFIG = {
     "allowed_extension": ['xlsx', 'xls'],
     "max_file_size" : 200,
     "sheet_name": "PTA",
-    "skip_rows": [1]
+    "skip_rows": [1],
+    # PTA sheet reader backend: "xml" (streamed sheet XML), "openpyxl"
+    # (read-only cells) or "pandas" (pd.read_excel)
+    "reader": "xml",
+    # load only the key/mass/reference columns for the comparison, the full
+    # sheet is parsed lazily for previews and the results display
+    "project_columns": True
+    }
+
+# ─── Caching ──────────────────────────────────────────────────────────────────
+CACHE_CONFIG = {
+    # comparison results kept for (old fingerprint, new fingerprint, pta type)
+    "comparison_max_entries": 8,
+    # cleaned, key-coded form of each side, reused when only the other file changes
+    "prepared_max_bytes": 512 * 1024 ** 2,
+    # parsed uploads shared across reruns and sessions, keyed by SHA-256
+    "upload_max_bytes": 512 * 1024 ** 2,
+    "upload_hash_max_entries": 64,
+    # highlighted reports built on demand, keyed like the comparison results
+    "report_max_entries": 4,
+    # non-PTA sheets of the results page, parsed when first shown
+    "workbook_max_entries": 4,
+    "sheet_max_bytes": 256 * 1024 ** 2,
+    }
+
+# ─── Comparison engine ────────────────────────────────────────────────────────
+COMPARISON_CONFIG = {
+    # inputs with at least this many rows (old + new) are compared partition
+    # by partition to bound the memory of the merge
+    "chunked_min_rows": 500_000,
+    "partitions": 16,
+    # opt-in multi-core engine (generate_results_parallel)
+    "parallel": False,
+    "max_workers": None,  # None → os.cpu_count()
+    "start_method": "spawn",
+    }
+
+# ─── Report export ────────────────────────────────────────────────────────────
+EXPORT_CONFIG = {
+    # "xml": patch the PTA sheet and styles.xml inside the uploaded package,
+    # copying every other entry unchanged; "openpyxl": load and save the
+    # whole workbook (also the fallback for unsupported layouts)
+    "mode": "xml",
+    }
+
+# ─── Results display ──────────────────────────────────────────────────────────
+DISPLAY_CONFIG = {
+    # rows of the results grid styled and sent to the browser per page
+    "page_size": 1000,
+    }
+
+# ─── Stage profiling (utils/profiling.py) ─────────────────────────────────────
+PROFILING_CONFIG = {
+    # wall time of every pipeline stage (perf_counter, negligible cost)
+    "enabled": True,
+    # also record the peak memory of every stage with tracemalloc: slows the
+    # allocation heavy stages down noticeably, turn on while investigating
+    "trace_memory": False,
+    # outermost stages (runs) kept for the diagnostics panel and JSON export
+    "max_runs": 50,
+    # show the diagnostics panel in the sidebar
+    "show_panel": False,
+    }
+
+# ─── Command line runner (cli.py) ─────────────────────────────────────────────
+CLI_CONFIG = {
+    # batch mode pairs '<name>_old.xlsx' with '<name>_new.xlsx'
+    "old_suffix": "_old",
+    "new_suffix": "_new",
+    "report_suffix": "_report.xlsx",
+    "summary_name": "summary.json",
+    "output_dir": "reports",
+    # history mode: changes per revision and per configuration, as CSV
+    # (a long chain easily exceeds the row limit of an Excel sheet)
+    "history_changes_name": "history_changes.csv",
+    "history_configurations_name": "history_configurations.csv",
+    "history_summary_name": "history_summary.json",
     }
 
 # ─── Columns Data ────────────────────────────────────────────────────
@@ -34,5 +110,30 @@ VU_COLUMNS_KEY: list =[
     "Moteur", "Boite", "Niveau", "Plaque de conception"
 ]
 
+PTA_COLUMNS_KEY: dict = {
+    "VP": VP_COLUMNS_KEY,
+    "VU": VU_COLUMNS_KEY
+}
+
 # ─── Root Path ────────────────────────────────────────────────────
-ROOT_PATH = Path(__file__).resolve().parent.parent
\ No newline at end of file
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+# ─── On-disk cache of parsed PTA sheets ───────────────────────────────────────
+DISK_CACHE_CONFIG = {
+    # keep the parsed PTA sheet of every upload as Feather, keyed by the
+    # SHA-256 of the workbook; sheets Arrow cannot round-trip exactly are
+    # only cached in memory (nothing here is ever unpickled)
+    "enabled": True,
+    "directory": ROOT_PATH / ".cache" / "pta",
+    # least recently used files are deleted above this size
+    "max_bytes": 2 * 1024 ** 3,
+    }
+
+# ─── Pinned baselines (core/baseline.py) ──────────────────────────────────────
+BASELINE_CONFIG = {
+    # one prepared and indexed baseline PTA per PTA type: a JSON manifest,
+    # Feather rows and .npy index arrays, read without unpickling anything.
+    # Whoever can write here still decides what "the baseline" is, keep it
+    # writable by the app user only.
+    "directory": ROOT_PATH / ".baselines",
+    }
\ No newline at end of file
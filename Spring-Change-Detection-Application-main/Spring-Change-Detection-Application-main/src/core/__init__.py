@@ -0,0 +1,12 @@
+"""
+Streamlit-free core of the application.
+
+  - core.ingest: read and validate PTA workbooks, lazy access to their sheets
+  - core.compare: the comparison engine
+  - core.baseline: pinned baseline PTAs and their persisted key index
+  - core.history: changes of every car across a chain of revisions
+  - core.export: the highlighted Excel report
+
+Heavy optional libraries (openpyxl, Pillow) are imported by the functions
+that use them, so importing the core stays cheap in worker processes.
+"""
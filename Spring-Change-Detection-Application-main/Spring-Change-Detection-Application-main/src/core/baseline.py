@@ -0,0 +1,369 @@
+"""
+Pinned baseline PTAs: one approved old revision per PTA type, prepared once.
+
+Pinning cleans and key-codes the baseline (see core.compare.prepare_side),
+packs every row's (composite key, duplicate sequence) into one integer and
+stores them sorted with their row positions: a persisted
+(key, sequence) → row index. New uploads are compared by coding their keys
+with the baseline dictionary and probing that index (binary search), which
+replaces the join of generate_results_df and gives the same result.
+
+On disk a baseline is a JSON manifest per PTA type ('<PTA>.json') naming
+its data directory: the prepared rows as Feather and the index arrays as
+.npy. Nothing is unpickled when loading it; the key dictionaries are
+rebuilt from the rows (pd.factorize is deterministic).
+"""
+#__TODO: import libraries_______________________________________________
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import BASELINE_CONFIG, REQUIRED_COLUMNS
+from core.compare import (
+    INT64_MAX, PreparedSide, cached_result, check_key_dtypes, classify_joined, factorize_side,
+    fingerprint_dataframe, generate_results_prepared, key_columns, prepare_side,
+    prepare_side_cached, promote_key_dtypes, side_sequence,
+)
+from utils.disk_cache import read_feather, write_feather
+from utils.profiling import stage
+
+# bumped when the stored layout or the cleaning rules change
+_FORMAT_VERSION = 2
+
+# loaded baselines keyed by PTA type, with the mtime of their manifest
+_LOADED: Dict[str, Tuple[float, "Baseline"]] = {}
+_LOCK = threading.Lock()
+
+
+class Baseline:
+    """
+    A pinned baseline PTA and its (key, sequence) → row index.
+
+    Args:
+        pta_type: Either "VP" or "VU".
+        name: Display name, e.g. the workbook file name.
+        digest: Content hash of the baseline workbook, used as the 'old'
+            fingerprint of the comparisons.
+        side: The prepared baseline (see prepare_side, side "old").
+        pinned_at: ISO timestamp of the pin.
+        index: (radix, order, sorted_keys) of a stored baseline, built from
+            side if None.
+    """
+
+    def __init__(
+        self,
+        pta_type: str,
+        name: str,
+        digest: str,
+        side: PreparedSide,
+        pinned_at: str,
+        index: Optional[Tuple[List[int], Optional[np.ndarray], Optional[np.ndarray]]] = None
+    ):
+        self.pta_type = pta_type
+        self.name = name
+        self.digest = digest
+        self.side = side
+        self.pinned_at = pinned_at
+        self.keys: List[str] = list(side.codes)
+        if index is None:
+            self._build_index()
+        else:
+            self.radix, self.order, self.sorted_keys = index
+
+    @property
+    def rows(self) -> int:
+        return len(self.side.frame)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The cleaned, trimmed baseline rows (with '__old_id')."""
+        return self.side.frame
+
+    #__TODO: Build the (key, sequence) → row index____________________________________
+    def _build_index(self) -> None:
+        """
+        Pack (key codes, sequence) in a mixed radix and sort the packed keys.
+
+        Code len(uniques) is the missing value of a key column, as in
+        core.compare.shared_codes. When the radix does not fit in int64 no
+        index is built and comparisons fall back to the prepared join.
+        """
+        sequence = side_sequence(self.side, self.keys)
+        self.radix = [len(self.side.uniques[key]) + 1 for key in self.keys]
+        self.radix.append(int(sequence.max()) + 1 if len(sequence) else 1)
+        if math.prod(self.radix) > INT64_MAX:
+            self.sorted_keys = self.order = None
+            return
+
+        packed = np.zeros(self.rows, dtype=np.int64)
+        for key, radix in zip(self.keys, self.radix):
+            codes = self.side.codes[key]
+            packed = packed * radix + np.where(codes < 0, radix - 1, codes)
+        packed = packed * self.radix[-1] + sequence
+        self.order = np.argsort(packed, kind="stable")
+        self.sorted_keys = packed[self.order]
+
+    def probe(self, new: PreparedSide, keys: List[str]) -> np.ndarray:
+        """
+        Baseline row matching every new row, -1 for new cars.
+
+        Args:
+            new: The prepared new side.
+            keys: Composite key columns (the baseline keys).
+
+        Returns:
+            Positions of the matching baseline rows.
+        """
+        n_rows = len(new.frame)
+        packed = np.zeros(n_rows, dtype=np.int64)
+        valid = np.ones(n_rows, dtype=bool)
+        for key, radix in zip(keys, self.radix):
+            # new dictionary → baseline codes: -1 for unseen values, and
+            # the missing value (local code -1) to the baseline missing code
+            remap = np.append(self.side.uniques[key].get_indexer(new.uniques[key]), radix - 1)
+            codes = remap[new.codes[key]]
+            valid &= codes >= 0
+            packed = packed * radix + np.maximum(codes, 0)
+        sequence = side_sequence(new, keys)
+        valid &= sequence < self.radix[-1]
+        packed = packed * self.radix[-1] + np.minimum(sequence, self.radix[-1] - 1)
+
+        if not len(self.sorted_keys):
+            return np.full(n_rows, -1, dtype=np.int64)
+        slots = np.minimum(np.searchsorted(self.sorted_keys, packed), len(self.sorted_keys) - 1)
+        found = valid & (self.sorted_keys[slots] == packed)
+        return np.where(found, self.order[slots], -1)
+
+    #__TODO: Compare a new upload with the baseline____________________________________
+    @stage("compare")
+    def compare(self, new: PreparedSide) -> pd.DataFrame:
+        """
+        generate_results_df(baseline, new) through the index.
+
+        Args:
+            new: The prepared new side (see prepare_side, side "new").
+
+        Returns:
+            The comparison result DataFrame.
+        """
+        keys = key_columns(self.frame, new.frame, self.pta_type)
+        if keys != self.keys or self.sorted_keys is None:
+            # the index does not cover these keys: join the prepared sides
+            return generate_results_prepared(self.side, new, self.pta_type)
+        for key in keys:
+            check_key_dtypes(self.side, new, key)
+
+        positions = self.probe(new, keys)
+        matched = positions >= 0
+
+        # the rows pd.merge(old, new, how="right") would have produced
+        reference, mass = REQUIRED_COLUMNS['reference'], REQUIRED_COLUMNS['mass']
+        merged = new.frame.copy(deep=False)
+        merged.columns = [
+            f"{col}_new" if col in (reference, mass) else col for col in merged.columns
+        ]
+        for col, name in ((reference, f"{reference}_old"), (mass, f"{mass}_old"), ('__old_id', '__old_id')):
+            if col in self.frame.columns:
+                merged[name] = pd.api.extensions.take(
+                    self.frame[col].to_numpy(), positions, allow_fill=True
+                )
+
+        has_deleted = int(matched.sum()) < self.rows
+        merged = promote_key_dtypes(merged, keys, self.frame, new.frame)
+        result_df = classify_joined(merged, keys, ~matched, has_deleted)
+        return result_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+
+
+#__TODO: Registry on disk_______________________________________________
+def _directory() -> Path:
+    return Path(BASELINE_CONFIG["directory"])
+
+
+def _manifest_path(pta_type: str) -> Path:
+    return _directory() / f"{pta_type}.json"
+
+
+def _read_manifest(pta_type: str) -> Optional[dict]:
+    try:
+        return json.loads(_manifest_path(pta_type).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _data_directory(manifest: dict) -> Optional[Path]:
+    """Data directory named by a manifest, None unless it is a plain name."""
+    name = manifest.get("data")
+    if not isinstance(name, str) or not name or Path(name).name != name or name.startswith("."):
+        return None
+    return _directory() / name
+
+
+def _store(baseline: Baseline) -> None:
+    """
+    Write the rows and the index in a new data directory, then switch the
+    manifest to it atomically and delete the previous directory.
+    """
+    directory = _directory()
+    if not directory.is_dir():
+        directory.mkdir(parents=True, exist_ok=True)
+        # pinned baselines are local state, keep them out of version control
+        (directory / ".gitignore").write_text("*\n", encoding="utf-8")
+    previous = _read_manifest(baseline.pta_type)
+
+    data = Path(tempfile.mkdtemp(dir=directory, prefix=f"{baseline.pta_type}-"))
+    try:
+        if not write_feather(data / "frame.feather", baseline.frame.reset_index(drop=True)):
+            raise ValueError("The baseline rows cannot be stored as Feather.")
+        if baseline.order is not None:
+            np.save(data / "order.npy", baseline.order, allow_pickle=False)
+            np.save(data / "sorted_keys.npy", baseline.sorted_keys, allow_pickle=False)
+        manifest = {
+            "version": _FORMAT_VERSION,
+            "pandas": pd.__version__,
+            "pta_type": baseline.pta_type,
+            "name": baseline.name,
+            "digest": baseline.digest,
+            "pinned_at": baseline.pinned_at,
+            "data": data.name,
+            "keys": baseline.keys,
+            "blank_keys": sorted(baseline.side.blank_keys),
+            "radix": baseline.radix,
+            "indexed": baseline.order is not None,
+        }
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, _manifest_path(baseline.pta_type))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    except BaseException:
+        shutil.rmtree(data, ignore_errors=True)
+        raise
+
+    old_data = _data_directory(previous) if previous else None
+    if old_data is not None and old_data != data:
+        shutil.rmtree(old_data, ignore_errors=True)
+
+
+def _load(manifest: dict) -> Optional[Baseline]:
+    """The baseline a manifest describes, None if its files are unusable."""
+    data = _data_directory(manifest)
+    if data is None:
+        return None
+    try:
+        frame = read_feather(data / "frame.feather")
+        keys = list(manifest["keys"])
+        side = PreparedSide(frame, *factorize_side(frame, keys), {}, frozenset(manifest["blank_keys"]))
+        order = sorted_keys = None
+        if manifest["indexed"]:
+            order = np.load(data / "order.npy", allow_pickle=False)
+            sorted_keys = np.load(data / "sorted_keys.npy", allow_pickle=False)
+            if len(order) != len(frame) or len(sorted_keys) != len(frame):
+                return None
+        return Baseline(
+            manifest["pta_type"], manifest["name"], manifest["digest"], side,
+            manifest["pinned_at"], ([int(r) for r in manifest["radix"]], order, sorted_keys)
+        )
+    except Exception:
+        return None
+
+
+def pin_baseline(
+    df: pd.DataFrame, pta_type: str, name: str, digest: Optional[str] = None
+) -> Baseline:
+    """
+    Prepare, index and persist a PTA as the baseline of its type, replacing
+    the previous one.
+
+    Args:
+        df: The baseline PTA DataFrame (projected or full).
+        pta_type: Either "VP" or "VU".
+        name: Display name, e.g. the workbook file name.
+        digest: Content hash of the workbook, fingerprint of df if None.
+
+    Returns:
+        The pinned baseline.
+    """
+    baseline = Baseline(
+        pta_type, name, digest or fingerprint_dataframe(df),
+        prepare_side(df, pta_type, "old"),
+        datetime.now().isoformat(timespec="seconds"),
+    )
+    _store(baseline)
+    with _LOCK:
+        _LOADED[pta_type] = (_manifest_path(pta_type).stat().st_mtime, baseline)
+    return baseline
+
+
+def pinned_baseline(pta_type: Optional[str]) -> Optional[Baseline]:
+    """
+    The baseline pinned for a PTA type (by any session or process), None
+    when there is none or it was stored by an incompatible version.
+    """
+    if not pta_type:
+        return None
+    try:
+        mtime = _manifest_path(pta_type).stat().st_mtime
+    except FileNotFoundError:
+        with _LOCK:
+            _LOADED.pop(pta_type, None)
+        return None
+
+    with _LOCK:
+        loaded = _LOADED.get(pta_type)
+        if loaded is not None and loaded[0] == mtime:
+            return loaded[1]
+    manifest = _read_manifest(pta_type)
+    if not isinstance(manifest, dict) or manifest.get("version") != _FORMAT_VERSION \
+            or manifest.get("pandas") != pd.__version__ or manifest.get("pta_type") != pta_type:
+        return None
+    baseline = _load(manifest)
+    if baseline is not None:
+        with _LOCK:
+            _LOADED[pta_type] = (mtime, baseline)
+    return baseline
+
+
+def unpin_baseline(pta_type: str) -> bool:
+    """Forget the baseline of a PTA type. Returns False if none was pinned."""
+    with _LOCK:
+        _LOADED.pop(pta_type, None)
+    manifest = _read_manifest(pta_type)
+    try:
+        _manifest_path(pta_type).unlink()
+    except FileNotFoundError:
+        return False
+    data = _data_directory(manifest) if isinstance(manifest, dict) else None
+    if data is not None:
+        shutil.rmtree(data, ignore_errors=True)
+    return True
+
+
+def compare_with_baseline_cached(
+    baseline: Baseline, new_df: pd.DataFrame, new_fingerprint: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Memoized comparison of a new PTA with a baseline, cached with the
+    comparisons of core.compare under (baseline digest, new fingerprint,
+    PTA type).
+
+    Returns:
+        The comparison result DataFrame (shared, do not mutate in place).
+    """
+    new_fingerprint = new_fingerprint or fingerprint_dataframe(new_df)
+    key = (baseline.digest, new_fingerprint, baseline.pta_type)
+    return cached_result(
+        key,
+        lambda: baseline.compare(prepare_side_cached(new_df, baseline.pta_type, "new", new_fingerprint))
+    )
@@ -0,0 +1,1036 @@
+"""
+Comparison engine: clean both PTA frames, join them on the composite car
+key and classify every new car (New, Spring Changed, Unchanged).
+
+Pure pandas/numpy with explicit inputs and outputs, no Streamlit.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from config import REQUIRED_COLUMNS,VP_COLUMNS_KEY, VU_COLUMNS_KEY, CACHE_CONFIG, COMPARISON_CONFIG
+from utils.cache import LRUCache, hash_bytes
+from utils.profiling import stage
+
+# comparison results shared across reruns, keyed by (old fp, new fp, pta type)
+_RESULTS_CACHE = LRUCache(max_entries=CACHE_CONFIG["comparison_max_entries"])
+# display views (new input columns + comparison metadata) keyed like the results
+_DISPLAY_CACHE = LRUCache(max_entries=CACHE_CONFIG["comparison_max_entries"])
+
+
+def _prepared_nbytes(side: "PreparedSide") -> int:
+    """Memory footprint of a cached prepared side."""
+    return int(side.frame.memory_usage(deep=True).sum()) + sum(
+        codes.nbytes for codes in side.codes.values()
+    )
+
+# cleaned and key-coded sides keyed by (fingerprint, pta type, "old"/"new")
+_PREPARED_CACHE = LRUCache(max_bytes=CACHE_CONFIG["prepared_max_bytes"], sizeof=_prepared_nbytes)
+
+#__TODO: Clean the dataframe_________________________________
+def _is_checkbox_value(value) -> bool:
+    return str(value).upper() == 'X'
+
+
+def _column_kind(s: pd.Series) -> str:
+    """
+    Decide how clean_dataframe normalizes a column.
+
+    Checkbox columns are detected from the distinct non-null values (or the
+    used categories) instead of upper-casing every cell.
+
+    Returns:
+        "checkbox" (all non-null values are 'X'), "text" (other object
+        columns) or "other".
+    """
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        used = s.cat.categories.take(np.unique(s.cat.codes[s.cat.codes >= 0]))
+        return "checkbox" if all(_is_checkbox_value(v) for v in used) else "other"
+    if pd.api.types.is_object_dtype(dtype):
+        uniques = s.unique()
+        uniques = uniques[~pd.isna(uniques)]
+        return "checkbox" if all(_is_checkbox_value(v) for v in uniques) else "text"
+    if dtype.kind in "biufcmM":
+        # str() of numbers, booleans and dates is never 'X'
+        return "checkbox" if s.isna().all() else "other"
+    # other extension dtypes (e.g. "string"): keep the cell-wise check
+    if s.dropna().astype(str).str.upper().isin({'X'}).all():
+        return "checkbox"
+    return "other"
+
+
+def _factorize_str(s: pd.Series):
+    """
+    Factorize a column for per-category string work.
+
+    Returns:
+        (codes, uniques), or None when distinct values could hash together
+        (e.g. 1, 1.0 and True) and would not give the same str().
+    """
+    values = s.to_numpy()
+    non_str = set(map(type, values[pd.notna(values)])) - {str}
+    if len(non_str) > 1:
+        return None
+    return pd.factorize(values)
+
+
+def _clean_column(s: pd.Series, kind: str) -> pd.Series:
+    """Normalize one column according to its kind (see _column_kind)."""
+    if kind == "checkbox":
+        # all 'X' → 1, else 0
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            flags = np.fromiter(
+                (_is_checkbox_value(v) for v in s.cat.categories), bool, len(s.cat.categories)
+            )
+            values = np.append(flags, False)[s.cat.codes.to_numpy()]
+        elif pd.api.types.is_object_dtype(s.dtype):
+            codes, uniques = pd.factorize(s)
+            flags = np.fromiter((_is_checkbox_value(v) for v in uniques), bool, len(uniques))
+            values = np.append(flags, False)[codes]
+        elif s.isna().all():
+            values = np.zeros(len(s), dtype=bool)
+        else:
+            values = s.astype(str).str.upper().eq('X').to_numpy()
+        return pd.Series(values.astype(int), index=s.index, name=s.name)
+
+    if kind == "text":
+        # strip whitespace & lowercase text, per category instead of per cell
+        factorized = _factorize_str(s)
+        if factorized is None:
+            return s.fillna('').astype(str).str.strip().str.lower()
+        codes, uniques = factorized
+        normalized = np.array([str(v).strip().lower() for v in uniques] + [''], dtype=object)
+        return pd.Series(normalized[codes], index=s.index, name=s.name)
+
+    # fill other missing values with 0
+    return s.fillna(0)
+
+
+def column_kinds(df: pd.DataFrame) -> Dict[str, str]:
+    """How clean_dataframe will normalize each column (see _column_kind)."""
+    return {col: _column_kind(df[col]) for col in df.columns}
+
+
+@stage("clean")
+def clean_dataframe(df: pd.DataFrame, kinds: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Normalize DataFrame columns:
+      - Convert all-X columns to 0/1 integers
+      - Strip and lowercase text columns
+      - Fill other NaNs with zeros
+
+    Each column is classified once from its distinct values and normalized
+    in a single pass; the input frame is never copied or modified.
+
+    Args:
+        df: Input DataFrame to clean.
+        kinds: Column kinds computed on the full frame (see column_kinds),
+            needed when cleaning a subset of its rows.
+
+    Returns:
+        A new DataFrame with cleaned data.
+    """
+    kinds = kinds or {}
+    cleaned = {
+        col: _clean_column(df[col], kinds.get(col) or _column_kind(df[col]))
+        for col in df.columns
+    }
+    return pd.DataFrame(cleaned, index=df.index, columns=df.columns)
+
+#__TODO: Classify the merged records_________________________________
+def classify_changes(
+    mass_diff: np.ndarray,
+    ref_old: np.ndarray,
+    ref_new: np.ndarray,
+    is_new: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Columnar classification of merged records.
+
+    Works on whole columns with numpy instead of row-wise apply:
+      - Mass Status: Increased / Decreased / Unchanged from the mass difference
+      - Reference Status: Change / No Change between old and new reference
+      - Change Type: New (right_only rows), Spring Changed or Unchanged
+
+    Args:
+        mass_diff: New mass minus old mass.
+        ref_old: Normalized old reference strings.
+        ref_new: Normalized new reference strings.
+        is_new: Boolean mask of records present only in the new file.
+
+    Returns:
+        Mass Status, Reference Status and Change Type arrays.
+    """
+    mass_status = np.select(
+        [mass_diff > 0, mass_diff < 0],
+        ["Increased", "Decreased"],
+        default="Unchanged"
+    ).astype(object)
+    ref_changed = ref_old != ref_new
+    ref_status = np.where(ref_changed, "Change", "No Change").astype(object)
+    change_type = np.select(
+        [is_new, ref_changed],
+        ["New", "Spring Changed"],
+        default="Unchanged"
+    ).astype(object)
+    return mass_status, ref_status, change_type
+
+#__TODO: Integer-coded composite keys_________________________________
+# upper bound of the packed integer keys
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def pack_codes(columns: List[Tuple[np.ndarray, int]], n_rows: int) -> np.ndarray:
+    """
+    Pack per-column codes (0 <= code < cardinality) into one int64 per row
+    (mixed radix), compressing the key built so far before it overflows.
+    """
+    packed = np.zeros(n_rows, dtype=np.int64)
+    size = 1
+    for codes, cardinality in columns:
+        if size > INT64_MAX // cardinality:
+            # compress the key built so far to stay within int64
+            packed, uniques_so_far = pd.factorize(packed)
+            size = len(uniques_so_far)
+        packed = packed * cardinality + codes
+        size *= cardinality
+    return packed
+
+
+def shared_codes(
+    factorizations: Sequence[Tuple[np.ndarray, pd.Index]]
+) -> Tuple[List[np.ndarray], int]:
+    """
+    Remap local factorizations of a key column (one per side) onto one
+    dictionary.
+
+    The first dictionary is kept as is and the unseen values of every
+    following side are appended to it; missing values (code -1) share the
+    last code, so they match each other as in pd.merge.
+
+    Args:
+        factorizations: (codes, uniques) of every side, see factorize_side.
+
+    Returns:
+        Shared codes of the rows of every side, and the cardinality.
+    """
+    dictionary = factorizations[0][1]
+    remaps = [np.arange(len(dictionary))]
+    for _, uniques in factorizations[1:]:
+        remap = dictionary.get_indexer(uniques)
+        unseen = remap < 0
+        if unseen.any():
+            remap[unseen] = len(dictionary) + np.arange(int(unseen.sum()))
+            dictionary = dictionary.append(uniques[unseen])
+        remaps.append(remap)
+
+    missing = len(dictionary)
+    codes = [
+        np.append(remap, missing)[side_codes]  # code -1 → missing
+        for remap, (side_codes, _) in zip(remaps, factorizations)
+    ]
+    return codes, missing + 1
+
+
+def sequence_duplicates(key: np.ndarray) -> np.ndarray:
+    """Occurrence number of each row among the rows sharing its key (cumcount)."""
+    return pd.Series(key).groupby(key, sort=False).cumcount().to_numpy()
+
+
+def pack_sequence(
+    old_key: np.ndarray,
+    old_seq: np.ndarray,
+    new_key: np.ndarray,
+    new_seq: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Combine packed keys and duplicate sequences into one join integer.
+
+    Returns:
+        Join keys of the old rows and of the new rows.
+    """
+    keys = np.concatenate([old_key, new_key])
+    seqs = np.concatenate([old_seq, new_seq])
+    n_seq = int(seqs.max()) + 1 if len(seqs) else 1
+    if len(keys) and int(keys.max()) > INT64_MAX // n_seq - 1:
+        keys = pd.factorize(keys)[0]
+    joined = keys * n_seq + seqs
+    return joined[:len(old_key)], joined[len(old_key):]
+
+#__TODO: Choose composite-key columns_________________________________
+def key_columns(old: pd.DataFrame, new: pd.DataFrame, pta_type: str) -> List[str]:
+    """Composite key columns of the PTA type present in both frames."""
+    keys = [k for k in pta_keys(pta_type) if k in old.columns and k in new.columns]
+    if not keys:
+        raise ValueError("No composite key columns found in both files.")
+    return keys
+
+
+def pta_keys(pta_type: str) -> List[str]:
+    """Composite key columns of a PTA type."""
+    if pta_type == "VP":
+        return VP_COLUMNS_KEY
+    return VU_COLUMNS_KEY
+
+
+#__TODO: Trim to the columns the comparison needs_________________________________
+def _trim_columns(df: pd.DataFrame, pta_type: str) -> pd.DataFrame:
+    """
+    Keep only the key, reference, mass and row-id columns.
+
+    The result never uses any other column, so both sides are trimmed
+    before cleaning and joining; extra attributes can be re-attached to the
+    result through the row ids ('Cell ID New'/'Cell ID Old').
+    """
+    wanted = set(pta_keys(pta_type)) | {
+        REQUIRED_COLUMNS["reference"], REQUIRED_COLUMNS["mass"], "__old_id", "__new_id"
+    }
+    return df[[col for col in df.columns if col in wanted]]
+
+
+#__TODO: Prepare one side for the join_________________________________
+class PreparedSide(NamedTuple):
+    """
+    One PTA frame ready for the join: trimmed, id-annotated and cleaned,
+    with every key column factorized on its own (local dictionary).
+
+    Nothing in it depends on the other side, so it is cached per upload
+    (see prepare_side_cached) and reused when only the other file changes.
+    """
+    frame: pd.DataFrame
+    codes: Dict[str, np.ndarray]
+    uniques: Dict[str, pd.Index]
+    # duplicate sequences keyed by the tuple of key columns used for the join
+    sequences: Dict[Tuple[str, ...], np.ndarray]
+    # key columns without any value before cleaning (empty sheet or all
+    # missing): cleaning makes them integer whatever the other side holds
+    blank_keys: FrozenSet[str] = frozenset()
+
+
+def factorize_side(
+    frame: pd.DataFrame, keys: List[str]
+) -> Tuple[Dict[str, np.ndarray], Dict[str, pd.Index]]:
+    """Local factorization of every key column of one side."""
+    codes, uniques = {}, {}
+    for key in keys:
+        codes[key], key_uniques = pd.factorize(frame[key])
+        uniques[key] = pd.Index(key_uniques)
+    return codes, uniques
+
+
+def _normalize_reference(s: pd.Series) -> pd.Series:
+    """Reference as stripped text without a trailing '.0' (Excel floats)."""
+    return s.fillna("").astype(str).str.replace(r"\.0$", "", regex=True).str.strip()
+
+
+@stage("prepare")
+def prepare_side(
+    df: pd.DataFrame,
+    pta_type: str,
+    side: str,
+    kinds: Optional[Dict[str, str]] = None
+) -> PreparedSide:
+    """
+    Trim, annotate row ids, clean and factorize the key columns of one side.
+
+    Args:
+        df: The old or new PTA DataFrame.
+        pta_type: Either "VP" or "VU".
+        side: "old" or "new", names the row-id column ('__old_id'/'__new_id').
+            Frames already carrying it (partitions) keep their ids.
+        kinds: Column kinds to clean with (see column_kinds), derived from
+            the frame if None.
+    """
+    id_col = f"__{side}_id"
+    frame = _trim_columns(df, pta_type).copy()
+    if id_col not in frame.columns:
+        frame[id_col] = frame.index + 3
+    keys = [key for key in pta_keys(pta_type) if key in frame.columns]
+    blank_keys = frozenset(key for key in keys if frame[key].isna().all())
+    frame = clean_dataframe(frame, kinds)
+    reference = REQUIRED_COLUMNS['reference']
+    if reference in frame.columns:
+        frame[reference] = _normalize_reference(frame[reference])
+    return PreparedSide(frame, *factorize_side(frame, keys), {}, blank_keys)
+
+
+def _key_side(frame: pd.DataFrame, keys: List[str], kinds: Dict[str, str]) -> PreparedSide:
+    """The key columns of one side only, cleaned and factorized."""
+    blank_keys = frozenset(key for key in keys if frame[key].isna().all())
+    cleaned = clean_dataframe(frame[keys], kinds)
+    return PreparedSide(cleaned, *factorize_side(cleaned, keys), {}, blank_keys)
+
+
+def side_sequence(side: PreparedSide, keys: List[str]) -> np.ndarray:
+    """Duplicate sequence of one side for these key columns, computed once."""
+    cache_key = tuple(keys)
+    if cache_key not in side.sequences:
+        # local codes group the rows exactly like the shared ones
+        local = pack_codes(
+            [(np.where(side.codes[key] < 0, len(side.uniques[key]), side.codes[key]),
+              len(side.uniques[key]) + 1) for key in keys],
+            len(side.frame)
+        )
+        side.sequences[cache_key] = sequence_duplicates(local)
+    return side.sequences[cache_key]
+
+
+def check_key_dtypes(left: PreparedSide, right: PreparedSide, key: str) -> None:
+    """
+    Refuse to join text keys with non-text keys, as pd.merge does.
+
+    A side whose key column had no value at all (e.g. an empty old sheet)
+    is not checked: its rows simply match none of the other side.
+    """
+    if key in left.blank_keys or key in right.blank_keys:
+        return
+    left, right = left.frame[key], right.frame[key]
+    if pd.api.types.is_object_dtype(left) != pd.api.types.is_object_dtype(right):
+        raise ValueError(
+            f"You are trying to merge on {left.dtype} and {right.dtype} columns "
+            f"for key '{key}'."
+        )
+
+
+def _shared_keys(
+    old: PreparedSide, new: PreparedSide, keys: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Packed composite keys of both sides over one shared dictionary."""
+    n_old = len(old.frame)
+    columns = []
+    for key in keys:
+        check_key_dtypes(old, new, key)
+        codes, cardinality = shared_codes(
+            [(old.codes[key], old.uniques[key]), (new.codes[key], new.uniques[key])]
+        )
+        columns.append((np.concatenate(codes), cardinality))
+    packed = pack_codes(columns, n_old + len(new.frame))
+    return packed[:n_old], packed[n_old:]
+
+
+def _join_frames(
+    old: PreparedSide, new: PreparedSide, pta_type: str
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[str], np.ndarray, np.ndarray]:
+    """
+    Pick the key columns and add the packed '__key' (composite key +
+    duplicate sequence) join column to copies of both prepared frames.
+
+    Returns:
+        Joinable old and new frames, the key columns and the packed
+        composite keys (without sequence) of the old and new rows.
+    """
+    keys = key_columns(old.frame, new.frame, pta_type)
+    old_key, new_key = _shared_keys(old, new, keys)
+    old_join, new_join = pack_sequence(
+        old_key, side_sequence(old, keys), new_key, side_sequence(new, keys)
+    )
+    return (
+        old.frame.assign(__key=old_join), new.frame.assign(__key=new_join),
+        keys, old_key, new_key
+    )
+
+
+def _prepare_frames(
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    pta_type: str,
+    old_kinds: Optional[Dict[str, str]] = None,
+    new_kinds: Optional[Dict[str, str]] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[str], np.ndarray, np.ndarray]:
+    """
+    Annotate row ids, clean both frames, pick the key columns and add the
+    packed '__key' (composite key + duplicate sequence) join column.
+
+    Frames that already carry '__old_id'/'__new_id' (partitions of a larger
+    comparison) keep their ids, and are cleaned with the given column kinds.
+
+    Returns:
+        Prepared old and new frames, the key columns and the packed
+        composite keys (without sequence) of the old and new rows.
+    """
+    return _join_frames(
+        prepare_side(old_df, pta_type, "old", old_kinds),
+        prepare_side(new_df, pta_type, "new", new_kinds),
+        pta_type
+    )
+
+
+#__TODO: Join and classify prepared rows_________________________________
+@stage("join")
+def _join_and_classify(
+    old: pd.DataFrame,
+    new: pd.DataFrame,
+    keys: List[str],
+    has_deleted: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Join prepared new rows to old rows and classify them.
+
+    Args:
+        old: Prepared old rows (see _prepare_frames).
+        new: Prepared new rows.
+        keys: Composite key columns.
+        has_deleted: Whether the whole comparison has deleted cars, which
+            makes 'Cell ID New' float like the former outer merge. Computed
+            from these rows when None.
+
+    Returns:
+        Unsorted result rows with the final column names.
+    """
+    #__TODO: Join new rows on key + sequence ________________________________
+    # key values are equal on both sides, keep them from the new file only;
+    # deleted cars (left_only) are not part of the result so a right join
+    # on the packed integer replaces the outer merge on the string keys
+    merged = pd.merge(
+        old.drop(columns=keys), new,
+        on = '__key',
+        how="right",
+        suffixes = ("_old", "_new"),
+        indicator=True
+    )
+    is_new = merged["_merge"].to_numpy() == "right_only"
+    if has_deleted is None:
+        has_deleted = int((~is_new).sum()) < len(old)
+    merged = promote_key_dtypes(merged, keys, old, new)
+    return classify_joined(merged, keys, is_new, has_deleted)
+
+
+def promote_key_dtypes(
+    merged: pd.DataFrame, keys: List[str], old: pd.DataFrame, new: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Cast the key columns of joined rows (taken from the new side) to the
+    dtype the former outer merge gave them: the common dtype of both sides,
+    which only differs from the new one when a side is blank (cleaned as
+    checkboxes).
+    """
+    promoted = [key for key in keys if old[key].dtype != new[key].dtype]
+    if not promoted:
+        return merged
+    dtypes = pd.concat([old[promoted].iloc[:0], new[promoted].iloc[:0]]).dtypes
+    return merged.astype(dtypes.to_dict())
+
+
+def classify_joined(
+    merged: pd.DataFrame,
+    keys: List[str],
+    is_new: np.ndarray,
+    has_deleted: bool
+) -> pd.DataFrame:
+    """
+    Normalize, classify and assemble joined rows.
+
+    Args:
+        merged: One row per new car: its key columns, '__new_id' and the
+            reference/mass columns suffixed '_new', plus '_old' columns and
+            '__old_id' of the matching old car (missing when unmatched).
+        keys: Composite key columns.
+        is_new: True for the rows without a matching old car.
+        has_deleted: Whether the comparison has deleted cars.
+
+    Returns:
+        Unsorted result rows with the final column names.
+    """
+    if has_deleted:
+        # an outer merge would have left NaN ids for the deleted cars
+        merged['__new_id'] = merged['__new_id'].astype(float)
+    
+    #__TODO: Fill missing references and normalize mass columns _______________________
+    ref_old = f"{REQUIRED_COLUMNS['reference']}_old"
+    ref_new = f"{REQUIRED_COLUMNS['reference']}_new"
+    mass_old = f"{REQUIRED_COLUMNS['mass']}_old"
+    mass_new = f"{REQUIRED_COLUMNS['mass']}_new"
+
+    # references were normalized per side by prepare_side, only the old
+    # reference of new cars is missing after the join
+    for col in (ref_old, ref_new):
+        merged[col] = merged[col].fillna("")
+
+    merged[mass_old] = merged.get(mass_old, 0).fillna(0).astype(float)
+    merged[mass_new] = merged.get(mass_new, 0).fillna(0).astype(float)
+    
+    #__TODO: Compute mass differences/status and detect reference changes __________
+    merged["Mass Difference"] = merged[mass_new] - merged[mass_old]
+    merged["Mass Status"], merged["Reference Status"], merged["Change Type"] = classify_changes(
+        merged["Mass Difference"].to_numpy(),
+        merged[ref_old].to_numpy(),
+        merged[ref_new].to_numpy(),
+        is_new,
+    )
+    
+    #__TODO: Assemble data _________________________________________________________
+    
+    result_cols = keys + [
+        ref_new, ref_old, mass_new, mass_old,
+        'Mass Difference', 'Mass Status', 'Reference Status', 'Change Type',
+        '__new_id', '__old_id'
+    ]
+    result_df = merged[result_cols].rename(columns={
+        ref_new: 'New Reference',
+        ref_old: 'Old Reference',
+        mass_new: 'New Mass',
+        mass_old: 'Old Mass',
+        '__new_id': 'Cell ID New',
+        '__old_id': 'Cell ID Old'
+    })
+    return result_df
+
+
+#__TODO: Generate the result_________________________________
+def generate_results_df(
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    pta_type: str = "VP"
+) -> pd.DataFrame:
+    """
+    Compare old and new PTA DataFrames to detect spring changes.
+
+    Steps:
+      1. Trim to key/reference/mass columns and annotate Excel row numbers
+      2. Clean both DataFrames and normalize their reference strings.
+      3. Determine composite key columns by PTA type. (VP, VU)
+      4. Factorize the key columns into one shared integer key and
+         sequence duplicates to handle identical keys.
+      5. Join new rows to old rows on key + sequence (deleted cars dropped).
+      6. Fill the missing references and normalize the mass columns.
+      7. Compute mass differences/status and detect reference changes.
+      8. Classify each record as New, Spring Changed, or Unchanged.
+      9. assemble result and select metadata columns
+      
+    Args:
+        old_df: Original PTA DataFrame.
+        new_df: Updated PTA DataFrame.
+        pta_type: Either "VP" or "VU" to select appropriate key columns.
+
+    Returns:
+        A DataFrame with comparison metadata and change classification.
+    """
+    
+    return generate_results_prepared(
+        prepare_side(old_df, pta_type, "old"),
+        prepare_side(new_df, pta_type, "new"),
+        pta_type
+    )
+
+
+def generate_results_prepared(
+    old: PreparedSide,
+    new: PreparedSide,
+    pta_type: str = "VP"
+) -> pd.DataFrame:
+    """
+    generate_results_df from already prepared sides (see prepare_side):
+    only the shared key dictionary, the join and the classification run.
+    """
+    old_frame, new_frame, keys, _, _ = _join_frames(old, new, pta_type)
+    result_df = _join_and_classify(old_frame, new_frame, keys)
+
+    # sort ascending by the new-cell ID
+    result_df = result_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+    return result_df
+
+
+#__TODO: Chunked comparison_________________________________
+def iter_results_chunked_prepared(
+    old: PreparedSide,
+    new: PreparedSide,
+    pta_type: str = "VP",
+    n_partitions: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the comparison of prepared sides (see prepare_side) partition by
+    partition.
+
+    Both sides are hash-partitioned on the packed composite key, so every
+    car and all its duplicates land in the same partition. Only one
+    partition is joined at a time, which bounds the memory of the merge.
+
+    Args:
+        old: Prepared old side.
+        new: Prepared new side.
+        pta_type: Either "VP" or "VU".
+        n_partitions: Number of partitions, defaults to
+            COMPARISON_CONFIG["partitions"].
+
+    Yields:
+        Result rows of one partition (unsorted across partitions).
+    """
+    n_partitions = n_partitions or COMPARISON_CONFIG["partitions"]
+    old, new, keys, old_key, new_key = _join_frames(old, new, pta_type)
+    has_deleted = not np.isin(old['__key'].to_numpy(), new['__key'].to_numpy()).all()
+
+    old_parts = _partition_slices(old_key % n_partitions, n_partitions)
+    new_parts = _partition_slices(new_key % n_partitions, n_partitions)
+    for old_rows, new_rows in zip(old_parts, new_parts):
+        if len(new_rows):
+            yield _join_and_classify(old.take(old_rows), new.take(new_rows), keys, has_deleted)
+
+
+def _partition_slices(partition: np.ndarray, n_partitions: int) -> List[np.ndarray]:
+    """Row positions of each partition, keeping the original row order."""
+    order = np.argsort(partition, kind="stable")
+    bounds = np.searchsorted(partition[order], np.arange(n_partitions + 1))
+    return [order[bounds[i]:bounds[i + 1]] for i in range(n_partitions)]
+
+
+def generate_results_chunked(
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    pta_type: str = "VP",
+    n_partitions: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Same result as generate_results_df, computed with iter_results_chunked_prepared.
+    """
+    return generate_results_chunked_prepared(
+        prepare_side(old_df, pta_type, "old"),
+        prepare_side(new_df, pta_type, "new"),
+        pta_type, n_partitions
+    )
+
+
+def generate_results_chunked_prepared(
+    old: PreparedSide,
+    new: PreparedSide,
+    pta_type: str = "VP",
+    n_partitions: Optional[int] = None
+) -> pd.DataFrame:
+    """generate_results_chunked from already prepared sides (see prepare_side)."""
+    chunks = list(iter_results_chunked_prepared(old, new, pta_type, n_partitions))
+    result_df = pd.concat(chunks, ignore_index=True) if chunks else _join_and_classify(
+        *_join_frames(old, new, pta_type)[:3]
+    )
+    result_df = result_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+    return result_df
+
+
+#__TODO: Parallel comparison_________________________________
+def _compare_partition(
+    old_part: pd.DataFrame,
+    new_part: pd.DataFrame,
+    pta_type: str,
+    old_kinds: Dict[str, str],
+    new_kinds: Dict[str, str],
+    has_deleted: bool
+) -> pd.DataFrame:
+    """Worker task: clean, sequence, join and classify one key partition."""
+    old, new, keys, _, _ = _prepare_frames(old_part, new_part, pta_type, old_kinds, new_kinds)
+    return _join_and_classify(old, new, keys, has_deleted)
+
+
+def generate_results_parallel(
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    pta_type: str = "VP",
+    max_workers: Optional[int] = None,
+    n_partitions: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Same result as generate_results_df, computed on several cores.
+
+    The parent only cleans the key columns to hash-partition both sides on
+    the composite key, and derives the column kinds from the full frames so
+    every worker cleans its rows exactly like a single-core run would. Each
+    partition is then cleaned, sequenced, joined and classified in a
+    ProcessPoolExecutor worker and the results are concatenated in
+    'Cell ID New' order.
+
+    Args:
+        old_df: Original PTA DataFrame.
+        new_df: Updated PTA DataFrame.
+        pta_type: Either "VP" or "VU".
+        max_workers: Worker processes, defaults to COMPARISON_CONFIG["max_workers"]
+            or the number of CPUs.
+        n_partitions: Partitions, defaults to 4 per worker.
+
+    Returns:
+        A DataFrame with comparison metadata and change classification.
+    """
+    max_workers = max_workers or COMPARISON_CONFIG["max_workers"] or os.cpu_count() or 1
+    n_partitions = n_partitions or 4 * max_workers
+
+    old = _trim_columns(old_df, pta_type).assign(__old_id=old_df.index + 3)
+    new = _trim_columns(new_df, pta_type).assign(__new_id=new_df.index + 3)
+    old_kinds, new_kinds = column_kinds(old), column_kinds(new)
+
+    # composite keys from the cleaned key columns only
+    keys = key_columns(old, new, pta_type)
+    old_key, new_key = _shared_keys(
+        _key_side(old, keys, old_kinds), _key_side(new, keys, new_kinds), keys
+    )
+    old_join, new_join = pack_sequence(
+        old_key, sequence_duplicates(old_key), new_key, sequence_duplicates(new_key)
+    )
+    has_deleted = not np.isin(old_join, new_join).all()
+
+    old_parts = _partition_slices(old_key % n_partitions, n_partitions)
+    new_parts = _partition_slices(new_key % n_partitions, n_partitions)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context(COMPARISON_CONFIG["start_method"])
+    ) as pool:
+        futures = [
+            pool.submit(
+                _compare_partition,
+                old.take(old_rows), new.take(new_rows),
+                pta_type, old_kinds, new_kinds, has_deleted
+            )
+            for old_rows, new_rows in zip(old_parts, new_parts)
+            if len(new_rows)
+        ]
+        chunks = [future.result() for future in futures]
+
+    # no new rows: no partition was submitted, the empty result keeps its schema
+    result_df = pd.concat(chunks, ignore_index=True) if chunks else _join_and_classify(
+        *_prepare_frames(old, new, pta_type, old_kinds, new_kinds)[:3]
+    )
+    result_df = result_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+    return result_df
+
+
+def generate_results_parallel_prepared(
+    old: PreparedSide,
+    new: PreparedSide,
+    pta_type: str = "VP",
+    max_workers: Optional[int] = None,
+    n_partitions: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    generate_results_parallel from already prepared sides (see prepare_side).
+
+    Both sides are cleaned already, so the parent only builds the join keys
+    and the workers join and classify one key partition each.
+    """
+    max_workers = max_workers or COMPARISON_CONFIG["max_workers"] or os.cpu_count() or 1
+    n_partitions = n_partitions or 4 * max_workers
+
+    old_frame, new_frame, keys, old_key, new_key = _join_frames(old, new, pta_type)
+    has_deleted = not np.isin(old_frame['__key'].to_numpy(), new_frame['__key'].to_numpy()).all()
+
+    old_parts = _partition_slices(old_key % n_partitions, n_partitions)
+    new_parts = _partition_slices(new_key % n_partitions, n_partitions)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context(COMPARISON_CONFIG["start_method"])
+    ) as pool:
+        futures = [
+            pool.submit(
+                _join_and_classify,
+                old_frame.take(old_rows), new_frame.take(new_rows), keys, has_deleted
+            )
+            for old_rows, new_rows in zip(old_parts, new_parts)
+            if len(new_rows)
+        ]
+        chunks = [future.result() for future in futures]
+
+    result_df = pd.concat(chunks, ignore_index=True) if chunks else _join_and_classify(
+        old_frame, new_frame, keys
+    )
+    result_df = result_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+    return result_df
+
+
+#__TODO: Engine selection_________________________________
+@stage("compare")
+def generate_results(
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    pta_type: str = "VP",
+    parallel: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Compare with the engine configured in COMPARISON_CONFIG: parallel if
+    enabled, chunked for large inputs, in memory otherwise.
+
+    Args:
+        old_df: Original PTA DataFrame.
+        new_df: Updated PTA DataFrame.
+        pta_type: Either "VP" or "VU".
+        parallel: Override COMPARISON_CONFIG["parallel"] (e.g. False inside
+            a worker process that already runs one comparison per core).
+
+    Returns:
+        The comparison result DataFrame.
+    """
+    if COMPARISON_CONFIG["parallel"] if parallel is None else parallel:
+        return generate_results_parallel(old_df, new_df, pta_type)
+    if len(old_df) + len(new_df) >= COMPARISON_CONFIG["chunked_min_rows"]:
+        return generate_results_chunked(old_df, new_df, pta_type)
+    return generate_results_df(old_df, new_df, pta_type)
+
+
+@stage("compare")
+def compare_prepared(
+    old: PreparedSide,
+    new: PreparedSide,
+    pta_type: str = "VP",
+    parallel: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    generate_results from already prepared sides (see prepare_side), with
+    the same engine selection.
+    """
+    if COMPARISON_CONFIG["parallel"] if parallel is None else parallel:
+        return generate_results_parallel_prepared(old, new, pta_type)
+    if len(old.frame) + len(new.frame) >= COMPARISON_CONFIG["chunked_min_rows"]:
+        return generate_results_chunked_prepared(old, new, pta_type)
+    return generate_results_prepared(old, new, pta_type)
+
+
+#__TODO: Memoized comparison_________________________________
+def fingerprint_dataframe(df: pd.DataFrame) -> str:
+    """
+    Content fingerprint of a DataFrame (values, index and column names).
+
+    Used when no upload hash is available for a frame.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    header = "\x1f".join(map(str, df.columns)).encode()
+    return hash_bytes(header + row_hashes.tobytes())
+
+
+def compare_cached(
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    pta_type: str = "VP",
+    old_fingerprint: Optional[str] = None,
+    new_fingerprint: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Memoized generate_results, run on the cached prepared sides of both inputs.
+
+    Results are keyed by the content fingerprint of both inputs plus the
+    PTA type, so reruns with the same uploads reuse the cached comparison.
+
+    Args:
+        old_df: Original PTA DataFrame.
+        new_df: Updated PTA DataFrame.
+        pta_type: Either "VP" or "VU".
+        old_fingerprint: Hash of the old upload, computed from the frame if None.
+        new_fingerprint: Hash of the new upload, computed from the frame if None.
+
+    Returns:
+        The comparison result DataFrame (shared, do not mutate in place).
+    """
+    key = (
+        old_fingerprint or fingerprint_dataframe(old_df),
+        new_fingerprint or fingerprint_dataframe(new_df),
+        pta_type,
+    )
+    def compute() -> pd.DataFrame:
+        # reuse the prepared side of a file that did not change, whatever
+        # the engine
+        return compare_prepared(
+            prepare_side_cached(old_df, pta_type, "old", key[0]),
+            prepare_side_cached(new_df, pta_type, "new", key[1]),
+            pta_type
+        )
+
+    return cached_result(key, compute)
+
+
+def cached_result(key: Tuple[str, str, str], compute) -> pd.DataFrame:
+    """
+    Shared memo of the comparison results, also used for the comparisons
+    with a pinned baseline (see core.baseline).
+
+    Args:
+        key: (old fingerprint, new fingerprint, PTA type), invalidated by
+            invalidate_results for either fingerprint.
+        compute: Called without arguments to build the result on a miss.
+    """
+    return _RESULTS_CACHE.get_or_compute(key, compute)
+
+
+def prepare_side_cached(
+    df: pd.DataFrame, pta_type: str, side: str, fingerprint: str
+) -> PreparedSide:
+    """Memoized prepare_side, keyed by (fingerprint, pta type, side)."""
+    return _PREPARED_CACHE.get_or_compute(
+        (fingerprint, pta_type, side), lambda: prepare_side(df, pta_type, side)
+    )
+
+
+def invalidate_results(fingerprint: str) -> int:
+    """
+    Drop every cached comparison involving the given file fingerprint.
+
+    Called when an uploaded file is replaced.
+
+    Returns:
+        Number of removed results.
+    """
+    _DISPLAY_CACHE.invalidate(lambda key: fingerprint in key[:2])
+    _PREPARED_CACHE.invalidate(lambda key: key[0] == fingerprint)
+    return _RESULTS_CACHE.invalidate(lambda key: fingerprint in key[:2])
+
+
+#__TODO: Display view of the results_________________________________
+# comparison metadata shown after the input columns of every car
+DISPLAY_COLUMNS: List[str] = [
+    'Old Reference', 'New Reference',
+    'Mass Status', 'Change Type',
+    'Cell ID New', 'Cell ID Old'
+]
+
+
+@stage("display_view")
+def build_display_view(result_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every column of the new PTA followed by the comparison metadata, one
+    row per result in 'Cell ID New' order.
+
+    Input rows are matched by row id ('Cell ID New'), not by position.
+    When the result already lists the new rows in order (the usual case)
+    the input columns are reused as they are instead of being copied.
+
+    Args:
+        result_df: Output of generate_results_df.
+        new_df: The full new PTA DataFrame the result was built from.
+
+    Returns:
+        The display DataFrame (shared, do not mutate in place).
+    """
+    if not result_df['Cell ID New'].is_monotonic_increasing:
+        result_df = result_df.sort_values('Cell ID New', ascending=True)
+    n_rows = len(result_df)
+
+    inputs = new_df
+    if inputs.columns.isin(DISPLAY_COLUMNS).any():
+        inputs = inputs.loc[:, ~inputs.columns.isin(DISPLAY_COLUMNS)]
+    ids = result_df['Cell ID New'].to_numpy(dtype=float) - 3
+    positions = np.where(np.isnan(ids), -1, ids).astype(np.int64)
+    if n_rows == len(inputs) and np.array_equal(positions, np.arange(n_rows)):
+        # shallow copy: the new columns below do not touch new_df's blocks
+        view = inputs.copy(deep=False)
+    else:
+        view = inputs.reset_index(drop=True).reindex(positions)
+    view.index = pd.RangeIndex(n_rows)
+
+    for col in DISPLAY_COLUMNS:
+        view[col] = result_df[col].to_numpy()
+    return view
+
+
+def display_view_cached(
+    result_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    key: Tuple
+) -> pd.DataFrame:
+    """
+    Memoized build_display_view.
+
+    Args:
+        result_df: Output of generate_results_df.
+        new_df: The full new PTA DataFrame.
+        key: Identity of the results, (old fingerprint, new fingerprint, pta type).
+
+    Returns:
+        The display DataFrame (shared, do not mutate in place).
+    """
+    return _DISPLAY_CACHE.get_or_compute(key, lambda: build_display_view(result_df, new_df))
@@ -0,0 +1,331 @@
+"""
+Highlighted Excel report: the uploaded new PTA workbook with the New and
+Spring Changed cars coloured in the PTA sheet.
+"""
+#__TODO: import libraries_______________________________________________
+import copy
+import io
+import re
+import zipfile
+from typing import Any, Dict, Tuple
+import pandas as pd
+from config import UPLOAD_CONFIG, EXPORT_CONFIG
+from core.ingest import _sheet_paths
+from utils.profiling import stage
+
+
+#__TODO: Report writer patching the xlsx XML_______________________________________________
+# highlight colour of each change type in the downloaded report
+HIGHLIGHT_COLORS: Dict[str, str] = {
+    'New': 'FF5733',
+    'Spring Changed': 'B4C6E7',
+}
+
+_ROW_RE = re.compile(rb"<row\b[^>]*?(?:/>|>.*?</row>)", re.S)
+_ROW_OPEN_RE = re.compile(rb"<row\b([^>]*?)(/?)>")
+_CELL_RE = re.compile(rb"<c\b[^>]*?(?:/>|>.*?</c>)", re.S)
+_CELL_REF_RE = re.compile(rb'<c\b[^>]*?\sr="([A-Z]+)\d+"')
+_ATTR_RE = {
+    name: re.compile(rb"\s" + name.encode() + rb'="([^"]*)"')
+    for name in ("r", "s", "spans", "fillId", "applyFill", "count")
+}
+_CHUNK_SIZE = 1 << 20
+
+
+class _ReportPatchError(Exception):
+    """The workbook layout is not supported by the XML patch writer."""
+
+
+def _set_attr(tag: bytes, name: str, value: Any) -> bytes:
+    """Set (or add) an attribute on the opening tag of an element."""
+    encoded = str(value).encode()
+    pattern = _ATTR_RE[name]
+    if pattern.search(tag):
+        return pattern.sub(b" " + name.encode() + b'="' + encoded + b'"', tag, count=1)
+    head = re.match(rb"<[\w:]+", tag).end()
+    return tag[:head] + b" " + name.encode() + b'="' + encoded + b'"' + tag[head:]
+
+
+def _cell_has_value(cell: bytes) -> bool:
+    """Whether openpyxl would load a non-None value for this <c> element."""
+    if b"<f" in cell:
+        return True
+    if b't="inlineStr"' in cell:
+        return b"<is" in cell
+    return re.search(rb"<v>[^<]", cell) is not None
+
+
+class _StylePatcher:
+    """
+    Adds the highlight fills and the cloned cell formats to styles.xml.
+
+    A highlighted cell keeps its own format (font, borders, number format)
+    with only the fill replaced, like assigning PatternFill in openpyxl.
+    """
+
+    def __init__(self, styles: bytes):
+        self.styles = styles
+        fills = re.search(rb"<fills\b[^>]*>(.*?)</fills>", styles, re.S)
+        cell_xfs = re.search(rb"<cellXfs\b[^>]*>(.*?)</cellXfs>", styles, re.S)
+        if fills is None or cell_xfs is None:
+            raise _ReportPatchError("styles.xml has no <fills>/<cellXfs> section")
+        n_fills = len(re.findall(rb"<fill\b", fills.group(1)))
+        self.fill_ids = {color: n_fills + i for i, color in enumerate(HIGHLIGHT_COLORS.values())}
+        self.xfs = re.findall(rb"<xf\b[^>]*?(?:/>|>.*?</xf>)", cell_xfs.group(1), re.S)
+        if not self.xfs:
+            raise _ReportPatchError("styles.xml has no cell formats")
+        self.clones: Dict[Tuple[int, str], int] = {}
+
+    def style_for(self, style_id: int, color: str) -> int:
+        """Index of the cell format `style_id` with the highlight fill."""
+        key = (style_id if style_id < len(self.xfs) else 0, color)
+        if key not in self.clones:
+            self.clones[key] = len(self.xfs) + len(self.clones)
+        return self.clones[key]
+
+    def patched(self) -> bytes:
+        fills = b"".join(
+            b'<fill><patternFill patternType="solid"><fgColor rgb="00' + color.encode()
+            + b'"/></patternFill></fill>'
+            for color in HIGHLIGHT_COLORS.values()
+        )
+        xfs = []
+        for (style_id, color), _ in sorted(self.clones.items(), key=lambda item: item[1]):
+            xf = self.xfs[style_id]
+            head = re.match(rb"<xf\b[^>]*?/?>", xf).group(0)
+            new_head = _set_attr(_set_attr(head, "fillId", self.fill_ids[color]), "applyFill", 1)
+            xfs.append(new_head + xf[len(head):])
+
+        styles = self.styles
+        styles = self._append(styles, b"fills", fills, len(self.fill_ids))
+        styles = self._append(styles, b"cellXfs", b"".join(xfs), len(xfs))
+        return styles
+
+    @staticmethod
+    def _append(styles: bytes, section: bytes, items: bytes, n_items: int) -> bytes:
+        open_tag = re.search(rb"<" + section + rb"\b[^>]*>", styles)
+        close_at = styles.index(b"</" + section + b">")
+        count = _ATTR_RE["count"].search(open_tag.group(0))
+        tag = open_tag.group(0)
+        if count is not None:
+            tag = _set_attr(tag, "count", int(count.group(1)) + n_items)
+        return (
+            styles[:open_tag.start()] + tag + styles[open_tag.end():close_at]
+            + items + styles[close_at:]
+        )
+
+
+def _column_letter(index: int) -> bytes:
+    from openpyxl.utils.cell import get_column_letter
+    return get_column_letter(index).encode()
+
+
+def _rewrite_row(row: bytes, row_idx: int, color: str, max_col: int, styles: _StylePatcher) -> bytes:
+    """Give every cell of the row (columns 1..max_col) the highlight fill."""
+    from openpyxl.utils.cell import column_index_from_string
+
+    open_tag = _ROW_OPEN_RE.match(row)
+    attrs = _ATTR_RE["spans"].sub(b"", open_tag.group(1))
+    body = b"" if open_tag.group(2) else row[open_tag.end():-len(b"</row>")]
+
+    cells: Dict[int, bytes] = {}
+    col = 0
+    for cell in _CELL_RE.findall(body):
+        ref = _ATTR_RE["r"].search(cell[:cell.index(b">")])
+        col = column_index_from_string(ref.group(1).rstrip(b"0123456789").decode()) if ref else col + 1
+        cells[col] = cell
+    last_col = max([max_col, *cells])
+
+    parts = []
+    for col in range(1, last_col + 1):
+        cell = cells.get(col)
+        if cell is None:
+            style = styles.style_for(0, color)
+            parts.append(b'<c r="' + _column_letter(col) + str(row_idx).encode() + b'" s="' + str(style).encode() + b'"/>')
+            continue
+        head_end = cell.index(b">") + 1
+        head = cell[:head_end]
+        current = _ATTR_RE["s"].search(head)
+        style = styles.style_for(int(current.group(1)) if current else 0, color)
+        if head.endswith(b"/>"):
+            parts.append(_set_attr(head[:-2], "s", style) + b"/>")
+        else:
+            parts.append(_set_attr(head[:-1], "s", style) + b">" + cell[head_end:])
+    return b"<row" + attrs + b">" + b"".join(parts) + b"</row>"
+
+
+def _max_sheet_column(archive: zipfile.ZipFile, path: str) -> int:
+    """Highest column index used by any cell of the sheet (ws.max_column)."""
+    from openpyxl.utils.cell import column_index_from_string
+
+    letters = set()
+    tail = b""
+    with archive.open(path) as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer = tail + chunk
+            letters.update(_CELL_REF_RE.findall(buffer))
+            tail = buffer[-64:]
+    return max((column_index_from_string(l.decode()) for l in letters), default=1)
+
+
+def _stream_patched_sheet(
+    archive: zipfile.ZipFile,
+    path: str,
+    out: Any,
+    row_colors: Dict[int, str],
+    styles: _StylePatcher
+) -> None:
+    """
+    Copy the sheet XML to `out`, rewriting only the highlighted rows.
+
+    Highlighting stops at the first data row whose first cell is empty,
+    like the openpyxl export.
+    """
+    start_row = UPLOAD_CONFIG["skip_rows"][0] + 2
+    max_col = _max_sheet_column(archive, path)
+    expected = start_row
+    active = True
+    buffer = b""
+    with archive.open(path) as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            buffer += chunk
+            pos = 0
+            for match in _ROW_RE.finditer(buffer):
+                row = match.group(0)
+                out.write(buffer[pos:match.start()])
+                pos = match.end()
+                if active:
+                    ref = _ATTR_RE["r"].search(_ROW_OPEN_RE.match(row).group(1))
+                    row_idx = int(ref.group(1)) if ref else expected
+                    if row_idx >= start_row:
+                        first = _CELL_RE.search(row)
+                        first_ref = _ATTR_RE["r"].search(first.group(0)[:first.group(0).index(b">")]) if first else None
+                        is_first_col = first is not None and (first_ref is None or first_ref.group(1) == b"A" + str(row_idx).encode())
+                        if row_idx != expected or not is_first_col or not _cell_has_value(first.group(0)):
+                            active = False
+                        else:
+                            expected += 1
+                            color = row_colors.get(row_idx)
+                            if color is not None:
+                                row = _rewrite_row(row, row_idx, color, max_col, styles)
+                out.write(row)
+            buffer = buffer[pos:]
+            if not chunk:
+                out.write(buffer)
+                break
+
+
+def _create_report_xml(data: bytes, row_colors: Dict[int, str]) -> bytes:
+    """
+    Highlighted report built by patching the xlsx package directly.
+
+    Every entry except the PTA worksheet and styles.xml is copied unchanged;
+    the PTA sheet is streamed with only the highlighted rows rewritten, and
+    styles.xml gains the two fills plus the cloned cell formats they need.
+    """
+    output = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        sheet_path = _sheet_paths(archive).get(UPLOAD_CONFIG["sheet_name"])
+        if sheet_path is None or "xl/styles.xml" not in archive.namelist():
+            raise _ReportPatchError("PTA sheet or styles.xml not found")
+        with archive.open(sheet_path) as f:
+            root = re.search(rb"<(\w+:)?worksheet\b", f.read(4096))
+        if root is None or root.group(1):
+            raise _ReportPatchError("namespace-prefixed worksheet XML")
+        styles = _StylePatcher(archive.read("xl/styles.xml"))
+
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in archive.infolist():
+                if info.filename in (sheet_path, "xl/styles.xml"):
+                    continue
+                target.writestr(info, archive.read(info))
+            # a copy: writing moves its header offset while the source sheet is read
+            sheet_info = copy.copy(archive.getinfo(sheet_path))
+            sheet_info.compress_type = zipfile.ZIP_DEFLATED
+            with target.open(sheet_info, "w") as out:
+                _stream_patched_sheet(archive, sheet_path, out, row_colors, styles)
+            styles_info = archive.getinfo("xl/styles.xml")
+            styles_info.compress_type = zipfile.ZIP_DEFLATED
+            target.writestr(styles_info, styles.patched())
+    return output.getvalue()
+
+
+#__TODO: Row highlighting lookup _______________________________________________
+def highlight_index(results_df: pd.DataFrame) -> Dict[int, str]:
+    """
+    Map the Excel row number of every highlighted car to its fill colour.
+
+    New rows are highlighted in orange, spring changed rows in blue
+    (see HIGHLIGHT_COLORS).
+    """
+    highlighted = results_df[results_df['Change Type'].isin(list(HIGHLIGHT_COLORS))]
+    return {
+        int(cell_id): HIGHLIGHT_COLORS[change_type]
+        for cell_id, change_type in zip(highlighted['Cell ID New'], highlighted['Change Type'])
+    }
+
+
+def _create_report_openpyxl(data: bytes, row_colors: Dict[int, str]) -> bytes:
+    """Highlighted report built by loading the whole workbook with openpyxl."""
+    from openpyxl import load_workbook
+    from openpyxl.styles import PatternFill
+
+    output = io.BytesIO()
+    wb = load_workbook(io.BytesIO(data))
+
+    # Get the PTA sheet
+    if UPLOAD_CONFIG["sheet_name"] in wb.sheetnames:
+        ws = wb[UPLOAD_CONFIG["sheet_name"]]
+
+        # Find data start row (after skipping header rows)
+        start_row = UPLOAD_CONFIG["skip_rows"][0] + 2  # Skip header + extra row
+
+        # the two fills are shared by all highlighted cells
+        fills = {color: PatternFill('solid', fgColor=color) for color in HIGHLIGHT_COLORS.values()}
+
+        # Walk the sheet once, up to the first row with an empty first cell
+        max_col = ws.max_column
+        for row in ws.iter_rows(min_row=start_row, max_col=max_col):
+            if row[0].value is None:
+                break
+            color = row_colors.get(row[0].row)
+            if color is not None:
+                for cell in row:
+                    cell.fill = fills[color]
+
+    wb.save(output)
+    return output.getvalue()
+
+
+#__TODO: Create the excel output _______________________________________________
+@stage("export")
+def create_report(data: bytes, results: pd.DataFrame) -> bytes:
+    """
+    Generate a complete Excel report as bytes that preserves all sheets from the
+    original PTA file while highlighting changes in the PTA sheet.
+
+    With EXPORT_CONFIG["mode"] == "xml" the report is written by patching the
+    workbook package (see _create_report_xml), falling back to openpyxl when
+    the workbook layout is not supported.
+
+    Args:
+        data: Raw bytes of the new PTA workbook.
+        results: Analysis results (or their display view) with at least
+            'Cell ID New' and 'Change Type'.
+
+    Returns:
+        Byte content of the Excel file.
+    """
+    # Index the highlighted rows once: Excel row number (Cell ID New) → colour
+    row_colors = highlight_index(results)
+
+    if EXPORT_CONFIG["mode"] == "xml":
+        try:
+            return _create_report_xml(data, row_colors)
+        except (_ReportPatchError, KeyError, ValueError, AttributeError, zipfile.BadZipFile):
+            pass
+    return _create_report_openpyxl(data, row_colors)
@@ -0,0 +1,276 @@
+"""
+History of a chain of PTA revisions: when did each car change?
+
+Every revision is prepared once (see core.compare.prepare_side) and all of
+them are aligned in one pass: the key columns are coded over one dictionary
+shared by every revision, and each (composite key, duplicate sequence)
+becomes one configuration id. Sorting the rows of all revisions by
+(configuration, revision) puts every row next to the same car in the
+previous revision, so a single vectorized comparison gives the changes of
+the whole chain. Memory grows with the total number of rows, never with
+the number of revision pairs.
+
+The changes between two consecutive revisions are exactly the rows of
+generate_results_df(previous, revision) that are not Unchanged (New or
+Spring Changed cars, or cars whose mass changed).
+"""
+#__TODO: import libraries_______________________________________________
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import REQUIRED_COLUMNS
+from core.compare import (
+    PreparedSide, check_key_dtypes, classify_changes, pack_codes, pack_sequence, prepare_side,
+    pta_keys, shared_codes, side_sequence,
+)
+from utils.profiling import stage
+
+
+#__TODO: Align the revisions on one key dictionary_______________________________________________
+def _history_keys(sides: List[PreparedSide], pta_type: str) -> List[str]:
+    """Composite key columns of the PTA type present in every revision."""
+    keys = [k for k in pta_keys(pta_type) if all(k in side.frame.columns for side in sides)]
+    if not keys:
+        raise ValueError("No composite key columns found in every revision.")
+    return keys
+
+
+def _global_codes(sides: List[PreparedSide], key: str) -> Tuple[np.ndarray, int]:
+    """
+    Code one key column of every revision over a single dictionary (see
+    core.compare.shared_codes).
+
+    Returns:
+        Codes of the rows of all revisions (concatenated) and the cardinality.
+    """
+    for before, after in zip(sides, sides[1:]):
+        check_key_dtypes(before, after, key)
+    codes, cardinality = shared_codes([(side.codes[key], side.uniques[key]) for side in sides])
+    return np.concatenate(codes), cardinality
+
+
+def _configurations(sides: List[PreparedSide], keys: List[str]) -> np.ndarray:
+    """
+    Configuration id of every row of every revision: equal (composite key,
+    duplicate sequence) pairs get the same id in all revisions.
+    """
+    n_rows = sum(len(side.frame) for side in sides)
+    packed = pack_codes([_global_codes(sides, key) for key in keys], n_rows)
+    sequence = np.concatenate([side_sequence(side, keys) for side in sides])
+    joined, _ = pack_sequence(packed, sequence, packed[:0], sequence[:0])
+    return pd.factorize(joined)[0]
+
+
+def _side_column(side: PreparedSide, column: str, fill) -> np.ndarray:
+    if column not in side.frame.columns:
+        return np.full(len(side.frame), fill, dtype=object)
+    return side.frame[column].to_numpy()
+
+
+#__TODO: Changes across the revisions_______________________________________________
+@stage("history")
+def generate_history_prepared(
+    sides: List[PreparedSide],
+    pta_type: str = "VP",
+    labels: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Changes of every car along a chain of prepared revisions.
+
+    Args:
+        sides: The revisions in chronological order (see prepare_side,
+            side "new").
+        pta_type: Either "VP" or "VU".
+        labels: Name of each revision, "1", "2"... if None.
+
+    Returns:
+        One row per car and revision where it changed, ordered by revision
+        then 'Cell ID New': the key columns, 'Configuration' (id of the car
+        across revisions), 'Revision', 'Previous Revision', then the result
+        columns of generate_results_df against the previous revision.
+    """
+    labels = [str(i + 1) for i in range(len(sides))] if labels is None else list(labels)
+    if len(labels) != len(sides):
+        raise ValueError("One label per revision is required.")
+    if len(sides) < 2:
+        raise ValueError("At least two revisions are required.")
+
+    keys = _history_keys(sides, pta_type)
+    configuration = _configurations(sides, keys)
+    sizes = [len(side.frame) for side in sides]
+    revision = np.repeat(np.arange(len(sides), dtype=np.int64), sizes)
+
+    reference, mass = REQUIRED_COLUMNS['reference'], REQUIRED_COLUMNS['mass']
+    references, _ = pd.factorize(np.concatenate([_side_column(side, reference, "") for side in sides]))
+    masses = np.concatenate([
+        pd.Series(_side_column(side, mass, 0)).fillna(0).to_numpy(dtype=float) for side in sides
+    ])
+
+    #__TODO: Pair every row with the same car in the previous revision _______________
+    order = np.lexsort((revision, configuration))
+    previous = np.full(len(order), -1, dtype=np.int64)
+    follows = (configuration[order[1:]] == configuration[order[:-1]]) & \
+        (revision[order[1:]] == revision[order[:-1]] + 1)
+    previous[order[1:][follows]] = order[:-1][follows]
+
+    matched = previous >= 0
+    old_masses = np.where(matched, masses[previous], 0.0)
+    changed = (revision > 0) & (
+        ~matched
+        | (references != np.where(matched, references[previous], -1))
+        | (masses != old_masses)
+    )
+
+    #__TODO: Assemble the changes of each revision _________________________________
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    parts = []
+    for position in range(1, len(sides)):
+        rows = slice(starts[position], starts[position + 1])
+        picked = np.flatnonzero(changed[rows])
+        # previous rows all belong to the previous revision
+        old_rows = previous[rows][picked]
+        old_rows = np.where(old_rows >= 0, old_rows - starts[position - 1], -1)
+        parts.append(_revision_changes(
+            sides[position - 1], sides[position], keys, picked, old_rows,
+            configuration[rows][picked], labels[position - 1], labels[position]
+        ))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _revision_changes(
+    before: PreparedSide,
+    after: PreparedSide,
+    keys: List[str],
+    rows: np.ndarray,
+    old_rows: np.ndarray,
+    configuration: np.ndarray,
+    previous_label: str,
+    label: str
+) -> pd.DataFrame:
+    """
+    Result rows of the changed cars of one revision against the previous one.
+
+    Args:
+        before: The previous revision.
+        after: The revision.
+        keys: Composite key columns.
+        rows: Positions of the changed rows in the revision.
+        old_rows: Position of the same car in the previous revision, -1 for
+            new cars.
+        configuration: Configuration id of the changed rows.
+        previous_label: Name of the previous revision.
+        label: Name of the revision.
+    """
+    reference, mass = REQUIRED_COLUMNS['reference'], REQUIRED_COLUMNS['mass']
+    matched = old_rows >= 0
+
+    frame = after.frame
+    changes = frame[keys].take(rows).reset_index(drop=True)
+    changes.insert(len(keys), 'Configuration', configuration)
+    changes['Revision'] = label
+    changes['Previous Revision'] = previous_label
+
+    ref_new = _side_column(after, reference, "")[rows]
+    ref_old = pd.api.extensions.take(
+        _side_column(before, reference, ""), old_rows, allow_fill=True, fill_value=""
+    )
+    mass_new = pd.Series(_side_column(after, mass, 0)[rows]).fillna(0).to_numpy(dtype=float)
+    mass_old = pd.Series(pd.api.extensions.take(
+        _side_column(before, mass, 0), old_rows, allow_fill=True
+    )).fillna(0).to_numpy(dtype=float)
+
+    mass_diff = mass_new - mass_old
+    mass_status, ref_status, change_type = classify_changes(mass_diff, ref_old, ref_new, ~matched)
+    changes['New Reference'] = ref_new
+    changes['Old Reference'] = ref_old
+    changes['New Mass'] = mass_new
+    changes['Old Mass'] = mass_old
+    changes['Mass Difference'] = mass_diff
+    changes['Mass Status'] = mass_status
+    changes['Reference Status'] = ref_status
+    changes['Change Type'] = change_type
+    changes['Cell ID New'] = frame['__new_id'].to_numpy()[rows]
+    changes['Cell ID Old'] = pd.api.extensions.take(
+        before.frame['__new_id'].to_numpy(dtype=float), old_rows, allow_fill=True
+    )
+    return changes.sort_values('Cell ID New', kind="stable")
+
+
+def generate_history(
+    revisions: List[pd.DataFrame],
+    pta_type: str = "VP",
+    labels: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Changes of every car along a chain of PTA revisions.
+
+    Each revision is cleaned and key-coded once, whatever the number of
+    revisions it is compared with (see generate_history_prepared).
+
+    Args:
+        revisions: PTA DataFrames in chronological order.
+        pta_type: Either "VP" or "VU" to select appropriate key columns.
+        labels: Name of each revision (e.g. its file name), "1", "2"... if None.
+
+    Returns:
+        One row per car and revision where it changed (see
+        generate_history_prepared).
+    """
+    sides = [prepare_side(df, pta_type, "new") for df in revisions]
+    return generate_history_prepared(sides, pta_type, labels)
+
+
+#__TODO: One row per configuration_______________________________________________
+def _joined_labels(changes: pd.DataFrame, mask: np.ndarray) -> pd.Series:
+    """Revisions of the masked changes of each configuration, comma separated."""
+    configurations = changes['Configuration'].to_numpy()[mask]
+    labels = changes['Revision'].to_numpy()[mask]
+    # changes are in revision order, a stable sort keeps it within a group
+    order = np.argsort(configurations, kind="stable")
+    configurations, labels = configurations[order], labels[order]
+    if not len(configurations):
+        return pd.Series([], index=pd.Index([], dtype=np.int64), dtype=object)
+    bounds = np.flatnonzero(np.diff(configurations)) + 1
+    return pd.Series(
+        [", ".join(group) for group in np.split(labels, bounds)],
+        index=configurations[np.concatenate([[0], bounds])]
+    )
+
+
+def summarize_history(changes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Revisions at which each configuration was added or changed.
+
+    Args:
+        changes: Output of generate_history.
+
+    Returns:
+        One row per configuration with at least one change: 'Configuration',
+        its key columns (as in its last change), 'Added In', 'Reference
+        Changed In', 'Mass Changed In' (revision names, comma separated),
+        the number of reference and mass changes and 'Last Reference'.
+    """
+    keys = list(changes.columns[:changes.columns.get_loc('Configuration')])
+    is_new = (changes['Change Type'] == "New").to_numpy()
+    ref_changed = (changes['Change Type'] == "Spring Changed").to_numpy()
+    mass_changed = ~is_new & (changes['Mass Status'] != "Unchanged").to_numpy()
+
+    last = changes.drop_duplicates('Configuration', keep="last").set_index('Configuration')
+    summary = last[keys + ['New Reference']]
+    summary = summary.rename(columns={'New Reference': 'Last Reference'})
+    summary['Added In'] = _joined_labels(changes, is_new)
+    summary['Reference Changed In'] = _joined_labels(changes, ref_changed)
+    summary['Mass Changed In'] = _joined_labels(changes, mass_changed)
+    summary = summary.fillna({'Added In': "", 'Reference Changed In': "", 'Mass Changed In': ""})
+    counts = pd.DataFrame(
+        {'Reference Changes': ref_changed, 'Mass Changes': mass_changed}
+    ).groupby(changes['Configuration'].to_numpy(), sort=False).sum()
+    summary = summary.join(counts)
+
+    columns = keys + [
+        'Added In', 'Reference Changed In', 'Mass Changed In',
+        'Reference Changes', 'Mass Changes', 'Last Reference'
+    ]
+    return summary[columns].sort_index().reset_index()
@@ -0,0 +1,670 @@
+"""
+Read and validate PTA workbooks.
+
+The PTA sheet is parsed by one of the READERS backends (streamed sheet XML
+by default) and cached by content hash; the other sheets of a workbook are
+parsed lazily through WorkbookSheets.
+"""
+#__TODO: import libraries_______________________________________________
+import io
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple, Optional
+import pandas as pd
+from pandas.io.parsers import TextParser
+from config import UPLOAD_CONFIG, REQUIRED_COLUMNS, CACHE_CONFIG, PTA_COLUMNS_KEY, DISK_CACHE_CONFIG
+from utils.cache import LRUCache, hash_bytes
+from utils.disk_cache import DiskFrameCache
+from utils.profiling import stage
+
+
+def _frame_nbytes(entry: Tuple[str, str, Optional[pd.DataFrame]]) -> int:
+    """Approximate memory footprint of a cached upload entry."""
+    df = entry[2]
+    return int(df.memory_usage(deep=True).sum()) if df is not None else 0
+
+# parsed PTA sheets and validation verdicts keyed by (SHA-256 of the upload, projection)
+_UPLOAD_CACHE = LRUCache(max_bytes=CACHE_CONFIG["upload_max_bytes"], sizeof=_frame_nbytes)
+# content hashes of uploaded file objects keyed by their upload id
+_HASH_CACHE = LRUCache(max_entries=CACHE_CONFIG["upload_hash_max_entries"])
+# valid parsed PTA sheets kept across restarts, behind _UPLOAD_CACHE
+_DISK_CACHE = (
+    DiskFrameCache(DISK_CACHE_CONFIG["directory"], DISK_CACHE_CONFIG["max_bytes"])
+    if DISK_CACHE_CONFIG["enabled"] else None
+)
+
+#__TODO: PTA sheet reader backends_______________________________________________
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _convert_value(value: Any) -> Any:
+    """Cell conversion used by pandas' openpyxl reader (empty -> '', 2.0 -> 2)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value == value:
+        as_int = int(value)
+        return as_int if as_int == value else value
+    return value
+
+
+def _rows_to_frame(
+    rows: Iterator[list],
+    columns: Optional[Sequence[str]] = None,
+    skip_rows: Optional[Sequence[int]] = tuple(UPLOAD_CONFIG["skip_rows"])
+) -> pd.DataFrame:
+    """
+    Build the PTA DataFrame from converted sheet rows.
+
+    Mirrors pandas' openpyxl reader: trailing empty cells and rows are
+    trimmed, rows are padded to the widest one, then the header/skiprows,
+    NA handling and dtype inference are done by pandas' TextParser.
+
+    Args:
+        rows: Converted cell values of every sheet row.
+        columns: Only keep these header names (column projection). Rows are
+            still trimmed on their full width so the row ids do not move.
+        skip_rows: Sheet rows skipped after the header (the PTA layout by
+            default, None for a plain sheet).
+    """
+    skipped = set(skip_rows or ())
+    header_idx = next(i for i in range(len(skipped) + 1) if i not in skipped)
+    positions = None
+
+    data = []
+    last_row_with_data = -1
+    for row_number, row in enumerate(rows):
+        while row and row[-1] == "":
+            row.pop()
+        if row:
+            last_row_with_data = row_number
+        if columns is not None:
+            if row_number == header_idx:
+                wanted = set(columns)
+                positions = []
+                for i, name in enumerate(row):
+                    if name in wanted:
+                        positions.append(i)
+                        wanted.discard(name)
+            if positions is not None:
+                width = len(row)
+                row = [row[i] if i < width else "" for i in positions]
+        data.append(row)
+    data = data[: last_row_with_data + 1]
+
+    if data:
+        max_width = max(len(row) for row in data)
+        for row in data:
+            if len(row) < max_width:
+                row.extend([""] * (max_width - len(row)))
+
+    if not data:
+        return pd.DataFrame()
+    parser = TextParser(data, header=0, skiprows=list(skip_rows) if skip_rows else None)
+    return parser.read()
+
+
+def _read_pta_pandas(data: bytes, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Reference backend: pandas.read_excel with the openpyxl engine."""
+    return pd.read_excel(
+        io.BytesIO(data),
+        engine="openpyxl",
+        sheet_name=UPLOAD_CONFIG["sheet_name"],
+        skiprows=UPLOAD_CONFIG["skip_rows"],
+        usecols=None if columns is None else (lambda name: name in set(columns)),
+    )
+
+
+def _read_pta_openpyxl(data: bytes, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Stream the PTA sheet with openpyxl in read-only mode.
+
+    Cells (not bare values) are read so that only error cells become NaN,
+    text that merely looks like an error code (e.g. "#N/A") is kept.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet_name = UPLOAD_CONFIG["sheet_name"]
+        if sheet_name not in wb.sheetnames:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        ws = wb[sheet_name]
+        ws.reset_dimensions()
+        rows = (
+            [float("nan") if cell.data_type == "e" else _convert_value(cell.value) for cell in row]
+            for row in ws.iter_rows()
+        )
+        return _rows_to_frame(rows, columns)
+    finally:
+        wb.close()
+
+
+def _sheet_paths(archive: zipfile.ZipFile, workbook: Optional[ET.Element] = None) -> Dict[str, str]:
+    """Map every sheet name of an xlsx archive to its worksheet XML path."""
+    if workbook is None:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_NS_PKG_REL}Relationship")}
+    paths: Dict[str, str] = {}
+    for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+        target = targets.get(sheet.get(f"{_NS_REL}id"), "")
+        if target.startswith("/"):
+            path = target.lstrip("/")
+        else:
+            path = posixpath.normpath(posixpath.join("xl", target))
+        paths[sheet.get("name")] = path
+    return paths
+
+
+class _SheetXmlReader:
+    """
+    Minimal streaming reader for one worksheet of an xlsx archive.
+
+    Reads the sheet XML with the C expat parser and applies the same cell
+    conversions as openpyxl (shared/inline strings, booleans, errors, dates
+    from the cell number format).
+    """
+
+    def __init__(self, archive: zipfile.ZipFile):
+        from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+
+        self.archive = archive
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        props = workbook.find(f"{_NS_MAIN}workbookPr")
+        self.date1904 = props is not None and props.get("date1904") in ("1", "true")
+
+        self.sheet_paths = _sheet_paths(archive, workbook)
+
+        self.shared_strings: List[str] = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            with archive.open("xl/sharedStrings.xml") as f:
+                for _, node in ET.iterparse(f):
+                    if node.tag == f"{_NS_MAIN}si":
+                        self.shared_strings.append(self._text(node))
+                        node.clear()
+
+        self.date_styles: Dict[int, bool] = {}
+        if "xl/styles.xml" in archive.namelist():
+            styles = ET.fromstring(archive.read("xl/styles.xml"))
+            custom = {
+                int(fmt.get("numFmtId")): fmt.get("formatCode")
+                for fmt in styles.iter(f"{_NS_MAIN}numFmt")
+            }
+            cell_xfs = styles.find(f"{_NS_MAIN}cellXfs")
+            for idx, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+                fmt_id = int(xf.get("numFmtId", 0))
+                code = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+                if code and is_date_format(code):
+                    # value marks timedelta formats
+                    self.date_styles[idx] = is_timedelta_format(code)
+
+    @staticmethod
+    def _text(node: ET.Element) -> str:
+        """Plain text of a string item, skipping phonetic runs."""
+        parts = []
+        for child in node:
+            if child.tag == f"{_NS_MAIN}t":
+                parts.append(child.text or "")
+            elif child.tag == f"{_NS_MAIN}r":
+                parts.extend(t.text or "" for t in child.iter(f"{_NS_MAIN}t"))
+        return "".join(parts)
+
+    def iter_rows(self, sheet_name: str) -> Iterator[list]:
+        """Yield the converted cell values of every row, filling missing rows/cells."""
+        from openpyxl.utils.cell import column_index_from_string
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+        if sheet_name not in self.sheet_paths:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        epoch = CALENDAR_MAC_1904 if self.date1904 else CALENDAR_WINDOWS_1900
+        tag_row, tag_c = f"{_NS_MAIN}row", f"{_NS_MAIN}c"
+        tag_v, tag_is = f"{_NS_MAIN}v", f"{_NS_MAIN}is"
+        col_cache: Dict[str, int] = {}
+        nan = float("nan")
+
+        expected_row = 1
+        row: Dict[int, Any] = {}
+        col_counter = 0
+        with self.archive.open(self.sheet_paths[sheet_name]) as f:
+            for _, node in ET.iterparse(f):
+                tag = node.tag
+                if tag == tag_c:
+                    ref = node.get("r")
+                    if ref:
+                        letters = ref.rstrip("0123456789")
+                        col = col_cache.get(letters)
+                        if col is None:
+                            col = col_cache[letters] = column_index_from_string(letters)
+                        col_counter = col
+                    else:
+                        col_counter += 1
+                        col = col_counter
+                    data_type = node.get("t", "n")
+                    if data_type == "inlineStr":
+                        child = node.find(tag_is)
+                        value = self._text(child) if child is not None else None
+                    else:
+                        value = node.findtext(tag_v) or None
+                        if value is not None:
+                            if data_type == "n":
+                                value = float(value) if ("." in value or "E" in value or "e" in value) else int(value)
+                                style = int(node.get("s", 0))
+                                if style in self.date_styles:
+                                    try:
+                                        value = from_excel(value, epoch, timedelta=self.date_styles[style])
+                                    except (OverflowError, ValueError):
+                                        value = nan
+                            elif data_type == "s":
+                                value = self.shared_strings[int(value)]
+                            elif data_type == "b":
+                                value = bool(int(value))
+                            elif data_type == "e":
+                                value = nan
+                            elif data_type == "d":
+                                value = from_ISO8601(value)
+                    if value is not None:
+                        row[col] = value
+                    node.clear()
+                elif tag == tag_row:
+                    ref = node.get("r")
+                    row_idx = int(ref) if ref else expected_row
+                    while expected_row < row_idx:
+                        expected_row += 1
+                        yield []
+                    width = max(row) if row else 0
+                    values = [""] * width
+                    for col, value in row.items():
+                        values[col - 1] = _convert_value(value)
+                    yield values
+                    expected_row = row_idx + 1
+                    row = {}
+                    col_counter = 0
+                    node.clear()
+
+
+def _read_pta_xml(data: bytes, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Stream the PTA sheet XML straight out of the xlsx archive."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        reader = _SheetXmlReader(archive)
+        return _rows_to_frame(reader.iter_rows(UPLOAD_CONFIG["sheet_name"]), columns)
+
+
+#__TODO: Lazy access to the other sheets of an upload_______________________________________________
+def _sheet_image_paths(archive: zipfile.ZipFile, sheet_path: str) -> List[str]:
+    """Media files of the pictures anchored on a worksheet (sheet → drawing → image rels)."""
+    def targets(part: str, rel_type: str) -> List[str]:
+        folder, name = posixpath.split(part)
+        rels_path = posixpath.join(folder, "_rels", name + ".rels")
+        if rels_path not in archive.namelist():
+            return []
+        rels = ET.fromstring(archive.read(rels_path))
+        paths = []
+        for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+            if rel.get("Type", "").endswith(rel_type) and rel.get("TargetMode") != "External":
+                target = rel.get("Target", "")
+                paths.append(
+                    target.lstrip("/") if target.startswith("/")
+                    else posixpath.normpath(posixpath.join(folder, target))
+                )
+        return paths
+
+    images = []
+    for drawing in targets(sheet_path, "/drawing"):
+        images.extend(path for path in targets(drawing, "/image") if path not in images)
+    return images
+
+
+def _thumbnail(data: bytes, max_width: int) -> Dict[str, Any]:
+    """
+    Downscale a picture to at most max_width pixels wide.
+
+    Returns:
+        {'data': PNG (or the untouched original) bytes, 'width'/'height':
+        size of the original picture in pixels}
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        if width <= max_width:
+            return {'data': data, 'width': width, 'height': height}
+        if img.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+            img = img.convert("RGBA")
+        img.thumbnail((max_width, max(1, height * max_width // width)))
+        output = io.BytesIO()
+        img.save(output, format="PNG", optimize=True)
+    return {'data': output.getvalue(), 'width': width, 'height': height}
+
+
+class WorkbookSheets:
+    """
+    Lazy view over the sheets of an uploaded workbook.
+
+    The archive is opened once; sheet names and picture locations come from
+    the package relationships, and a sheet (or its pictures) is only parsed
+    when asked for.
+    Instances are shared per upload hash (see workbook_sheets).
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._archive = zipfile.ZipFile(io.BytesIO(data))
+        self._paths = _sheet_paths(self._archive)
+        self._reader: Optional[_SheetXmlReader] = None
+        # thumbnails keyed by (SHA-256 of the media file, max width)
+        self._thumbnails: Dict[Tuple[str, int], Optional[Dict[str, Any]]] = {}
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """Sheet names in workbook order."""
+        return list(self._paths)
+
+    def has_images(self, sheet_name: str) -> bool:
+        """Whether pictures are anchored on the sheet, without loading them."""
+        path = self._paths.get(sheet_name)
+        return path is not None and bool(_sheet_image_paths(self._archive, path))
+
+    def load(self, sheet_name: str) -> pd.DataFrame:
+        """Parse one sheet like pd.read_excel(sheet_name=...) with default options."""
+        if self._reader is None:
+            self._reader = _SheetXmlReader(self._archive)
+        return _rows_to_frame(self._reader.iter_rows(sheet_name), skip_rows=None)
+
+    def images(self, sheet_name: str, max_width: int) -> List[Dict[str, Any]]:
+        """
+        Thumbnails of the pictures of a sheet, read straight from xl/media.
+
+        Identical pictures are shown once and every media file is decoded
+        once per workbook; files PIL cannot read (EMF, WMF) are skipped.
+        """
+        path = self._paths.get(sheet_name)
+        if path is None:
+            return []
+        images, seen = [], set()
+        for media in _sheet_image_paths(self._archive, path):
+            if media not in self._archive.namelist():
+                continue
+            data = self._archive.read(media)
+            key = (hash_bytes(data), max_width)
+            if key in seen:
+                continue
+            seen.add(key)
+            if key not in self._thumbnails:
+                try:
+                    self._thumbnails[key] = _thumbnail(data, max_width)
+                except (OSError, ValueError):
+                    self._thumbnails[key] = None
+            if self._thumbnails[key] is not None:
+                images.append(self._thumbnails[key])
+        return images
+
+
+def _sheet_nbytes(df: pd.DataFrame) -> int:
+    """Memory footprint of a cached sheet."""
+    return int(df.memory_usage(deep=True).sum())
+
+# open workbooks keyed by upload hash, and their parsed sheets keyed by (hash, sheet name)
+_WORKBOOK_CACHE = LRUCache(max_entries=CACHE_CONFIG["workbook_max_entries"])
+_SHEET_CACHE = LRUCache(max_bytes=CACHE_CONFIG["sheet_max_bytes"], sizeof=_sheet_nbytes)
+
+
+# available backends for read_pta (UPLOAD_CONFIG["reader"])
+READERS: Dict[str, Callable[[bytes, Optional[Sequence[str]]], pd.DataFrame]] = {
+    "pandas": _read_pta_pandas,
+    "openpyxl": _read_pta_openpyxl,
+    "xml": _read_pta_xml,
+}
+
+
+#__TODO: Validate the uploaded excel buffer_______________________________________________
+@stage("ingest")
+def validate_excel_file(
+    file: Any, file_label: str, columns: Optional[Sequence[str]] = None
+) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+    """
+    Args:
+        file: Uploaded file.
+        file_label: A label for the file (e.g., "old", "new").
+        columns: Only load these columns of the PTA sheet (see
+            projection), None loads every column.
+
+    Returns:
+        Tuple containing:
+          - validity (bool)
+          - message (str)
+          - DataFrame if valid, else None
+    """
+    if not file:
+        return False, f"No '{file_label}' file uploaded.", None
+
+    data = read_bytes(file)
+    projected = tuple(columns) if columns is not None else None
+    digest = content_hash(file, data)
+    status, detail, df = _UPLOAD_CACHE.get_or_compute(
+        (digest, projected),
+        lambda: parse_cached(data, digest, projected)
+    )
+
+    if status == "read_error":
+        return False, f"Error reading '{file_label}' file: {detail}", None
+    if status == "empty":
+        return False, f"'{file_label}' file is empty.", None
+    if status == "invalid":
+        return False, detail, None
+    return True, "File uploaded successfully.", df
+
+
+#__TODO: Columns needed by the comparison_______________________________________________
+def projection(pta_type: str) -> Optional[List[str]]:
+    """
+    Columns the comparison needs for a PTA type: the composite key plus
+    the mass and reference columns.
+
+    Returns:
+        The column list, or None when UPLOAD_CONFIG["project_columns"]
+        is disabled (load every column).
+    """
+    if not UPLOAD_CONFIG["project_columns"]:
+        return None
+    keys = PTA_COLUMNS_KEY.get(pta_type, PTA_COLUMNS_KEY["VU"])
+    return list(keys) + [REQUIRED_COLUMNS["mass"], REQUIRED_COLUMNS["reference"]]
+
+
+#__TODO: Lazily load the full PTA sheet_______________________________________________
+def load_full(file: Any) -> Optional[pd.DataFrame]:
+    """
+    Every column of the PTA sheet, for previews and the results display.
+
+    Parsed on first use only and cached like the projected frames.
+    """
+    return validate_excel_file(file, "full")[2] if file else None
+
+
+#__TODO: Lazily load the other sheets_______________________________________________
+def workbook_sheets(file: Any) -> Optional[WorkbookSheets]:
+    """Lazy sheet provider of an upload, shared by every rerun of the same file."""
+    if not file:
+        return None
+    data = read_bytes(file)
+    return _WORKBOOK_CACHE.get_or_compute(
+        content_hash(file, data), lambda: WorkbookSheets(data)
+    )
+
+
+def load_sheet(file: Any, sheet_name: str) -> pd.DataFrame:
+    """
+    Parse one sheet of an upload on first use, then serve it from cache.
+
+    Args:
+        file: Uploaded file.
+        sheet_name: Name of the sheet to load.
+
+    Returns:
+        The sheet as read by pd.read_excel with default options.
+    """
+    data = read_bytes(file)
+    file_hash = content_hash(file, data)
+    return _SHEET_CACHE.get_or_compute(
+        (file_hash, sheet_name),
+        lambda: _WORKBOOK_CACHE.get_or_compute(file_hash, lambda: WorkbookSheets(data)).load(sheet_name)
+    )
+
+
+#__TODO: Parse and validate raw bytes (cached by content hash)_____________________
+def parse_and_validate(
+    data: bytes, columns: Optional[Sequence[str]] = None
+) -> Tuple[str, str, Optional[pd.DataFrame]]:
+    """
+    Parse the PTA sheet (or the projected columns) from raw workbook bytes
+    and validate it.
+
+    The verdict does not depend on the file label so it can be shared
+    between the old and new slots and across sessions.
+
+    Returns:
+        Tuple containing:
+          - status ("ok", "read_error", "empty" or "invalid")
+          - detail message
+          - DataFrame if valid, else None
+    """
+    try:
+        df = read_pta(data, columns=columns).reset_index(drop=True)
+    except Exception as e:
+        return "read_error", str(e), None
+
+    if df.empty:
+        return "empty", "", None
+
+    is_valid, msg = validate_columns(df)
+    if not is_valid:
+        return "invalid", msg, None
+
+    return "ok", "", df
+
+
+#__TODO: Parsed sheets cached on disk_______________________________________________
+def _disk_key(digest: str, columns: Optional[Sequence[str]]) -> str:
+    """
+    File name of a parsed sheet: the workbook hash plus a digest of every
+    setting the parsed frame depends on.
+    """
+    settings = (
+        None if columns is None else list(columns),
+        UPLOAD_CONFIG["sheet_name"], list(UPLOAD_CONFIG["skip_rows"]), pd.__version__,
+    )
+    return f"{digest}-{hash_bytes(repr(settings).encode('utf-8'))[:16]}"
+
+
+def parse_cached(
+    data: bytes, digest: str, columns: Optional[Sequence[str]] = None
+) -> Tuple[str, str, Optional[pd.DataFrame]]:
+    """
+    parse_and_validate behind the on-disk cache: a workbook already parsed
+    and validated (by any session, process or earlier run) is reloaded from
+    its Feather copy instead of being parsed again.
+
+    Args:
+        data: Raw bytes of the workbook.
+        digest: SHA-256 of data (see content_hash).
+        columns: Only load these columns of the PTA sheet.
+
+    Returns:
+        Same as parse_and_validate.
+    """
+    if _DISK_CACHE is None:
+        return parse_and_validate(data, columns)
+
+    key = _disk_key(digest, columns)
+    df = _DISK_CACHE.get(key)
+    if df is not None:
+        return "ok", "", df
+
+    result = parse_and_validate(data, columns)
+    if result[0] == "ok":
+        try:
+            _DISK_CACHE.put(key, result[2])
+        except OSError:
+            # read-only or full disk: the cache is an optimization only
+            pass
+    return result
+
+
+#__TODO: Read the PTA sheet with the configured backend____________________________
+@stage("read_excel")
+def read_pta(
+    data: bytes, reader: Optional[str] = None, columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Read the PTA sheet from raw workbook bytes.
+
+    Args:
+        data: Raw bytes of the xlsx file.
+        reader: Backend name from READERS, defaults to UPLOAD_CONFIG["reader"].
+        columns: Only materialize these columns, None reads all of them.
+
+    Returns:
+        The PTA sheet as a DataFrame, identical to pd.read_excel's output.
+    """
+    reader = reader or UPLOAD_CONFIG["reader"]
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader '{reader}', expected one of {sorted(READERS)}.")
+    return READERS[reader](data, columns)
+
+
+#__TODO: Content hash of an upload_______________________________________________
+def content_hash(file: Any, data: Optional[bytes] = None) -> str:
+    """
+    SHA-256 of the uploaded bytes.
+
+    Streamlit uploads carry a 'file_id' that is stable across reruns, so
+    the digest is only computed once per upload.
+
+    Args:
+        file: Uploaded file, path or file-like object.
+        data: Raw bytes of the file when already read.
+
+    Returns:
+        Hex digest of the file content.
+    """
+    file_id = getattr(file, "file_id", None)
+    if file_id is None:
+        return hash_bytes(data if data is not None else read_bytes(file))
+    return _HASH_CACHE.get_or_compute(
+        file_id,
+        lambda: hash_bytes(data if data is not None else read_bytes(file))
+    )
+
+
+def read_bytes(file: Any) -> bytes:
+    """Return the raw bytes of an upload, a path or a file-like object."""
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "read"):
+        file.seek(0)
+        return file.read()
+    with open(file, "rb") as f:
+        return f.read()
+
+
+#__TODO: Validate the crucial columns_______________________________________________
+def validate_columns(df: pd.DataFrame) -> Tuple[bool, str]:
+    """
+    Check for required columns
+
+    Args:
+        df: DataFrame to validate.
+
+    Returns:
+        validity and error message if invalid.
+    """
+    required_cols = [
+        REQUIRED_COLUMNS["mass"],
+        REQUIRED_COLUMNS["reference"],
+    ]
+    missing = [col for col in required_cols if col not in df.columns]
+    if missing:
+        return False, f"Missing columns: {', '.join(missing)}."
+    return True, ""
@@ -3,7 +3,8 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 from utils.session_state import SessionStateManager
-from data_processing import generate_results_df
+from core.compare import compare_cached
+from core.baseline import compare_with_baseline_cached, pinned_baseline
 
 def render_overview(result_df: pd.DataFrame) -> None:
     """
@@ -76,16 +77,33 @@ def render_change_type_distribution(result_df: pd.DataFrame) -> None:
     )
     st.plotly_chart(fig, use_container_width=True)
 
+def compute_results() -> pd.DataFrame:
+    """
+    Compare the session inputs: the new upload against the pinned baseline
+    when it is used as the old PTA (index probe), against the old upload
+    otherwise.
+    """
+    pta_type = st.session_state.get("pta_type")
+    new_df = st.session_state.get("input_excel_new")
+    if st.session_state.get("baseline_in_use"):
+        baseline = pinned_baseline(pta_type)
+        if baseline is not None and baseline.digest == st.session_state.get("old_file_hash"):
+            return compare_with_baseline_cached(
+                baseline, new_df, st.session_state.get("new_file_hash")
+            )
+    return compare_cached(
+        st.session_state.get("input_excel_old"), new_df, pta_type,
+        st.session_state.get("old_file_hash"),
+        st.session_state.get("new_file_hash")
+    )
+
 def render_analysis():
     """
     Load session state and render all analysis sections.
     """
     SessionStateManager.initialize()
-    old_df = st.session_state.get("input_excel_old")
-    new_df = st.session_state.get("input_excel_new")
-    pta_type = st.session_state.get("pta_type")
-    
-    result_df = generate_results_df(old_df, new_df, pta_type)
+    result_df = compute_results()
+    st.session_state["results"] = result_df
 
     if result_df.empty:
         st.error("No data found. Please upload and process files first.")
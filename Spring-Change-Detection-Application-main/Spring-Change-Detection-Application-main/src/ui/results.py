@@ -1,10 +1,14 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import io
-import base64
-from file_handler import FileHandler
-from openpyxl import load_workbook
-from config import UPLOAD_CONFIG
+from file_handler import FileHandler, HIGHLIGHT_COLORS
+from config import UPLOAD_CONFIG, DISPLAY_CONFIG
+from core.compare import fingerprint_dataframe, display_view_cached
+from utils.profiling import stage
+
+
+# cell style of each highlighted change type, same colours as the report
+ROW_STYLES = {change_type: f'background-color: #{color}' for change_type, color in HIGHLIGHT_COLORS.items()}
 
 
 class Result:
@@ -14,9 +18,12 @@ class Result:
     """
     def __init__(self):
         """Initialize with session state data"""
-        self.new_df = st.session_state.get('input_excel_new', pd.DataFrame())
         self.res_df = st.session_state.get('results', pd.DataFrame())
         self.uploaded_file = st.session_state.get('new_file_object')
+        # the session frame may only hold the comparison columns
+        self.new_df = FileHandler.load_full(self.uploaded_file)
+        if self.new_df is None:
+            self.new_df = st.session_state.get('input_excel_new', pd.DataFrame())
         
         # Configure display settings
         self.image_max_width = 800  # Maximum width for displayed images in pixels
@@ -24,156 +31,85 @@ class Result:
     # ---- DATA PROCESSING METHODS ----
     
     @staticmethod
-    def _highlight_row(row):
-        """Apply conditional formatting to rows based on change type"""
-        if row['Change Type'] == 'New':
-            return ['background-color: #FF5733'] * len(row)
-        if row['Change Type'] == 'Spring Changed':
-            return ['background-color: #B4C6E7'] * len(row)
-        return [''] * len(row)
+    def _highlight_rows(df):
+        """Row colours of a whole frame at once, based on the change type (Styler axis=None)"""
+        css = df['Change Type'].map(ROW_STYLES).fillna('').to_numpy()
+        return pd.DataFrame(
+            np.repeat(css[:, None], df.shape[1], axis=1),
+            index=df.index, columns=df.columns
+        )
     
     def _prepare_display_data(self):
-        """Prepare the data for display by merging with results"""
-        # Merge new input with metadata and sort
-        display_df = self.new_df.copy()
-        
-        metadata_cols = [
-            'Old Reference', 'New Reference',
-            'Mass Status', 'Change Type',
-            'Cell ID New', 'Cell ID Old'
-        ]
-        
-        for col in metadata_cols:
-            display_df[col] = self.res_df[col]
-            
-        return display_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+        """
+        New input columns joined with the results metadata by 'Cell ID New',
+        built once per comparison and shared by the grid and the export
+        """
+        return display_view_cached(self.res_df, self.new_df, self._results_key())
     
     # ---- EXCEL DATA EXTRACTION METHODS ----
     
     def _get_sheets_from_excel(self):
         """
-        Extract all sheets and graphical elements from the uploaded Excel file
+        Lazy provider for the sheets of the uploaded Excel file: only the
+        sheet names are read here, each sheet is parsed when it is shown
         """
         if not self.uploaded_file:
-            return {}, {}
-        
-        # Load the workbook from the uploaded file
-        excel_data = io.BytesIO(self.uploaded_file.getvalue())
+            return None
         
-        # Get all sheet names using pandas (handles special characters better)
         try:
-            excel_file = pd.ExcelFile(excel_data)
-            sheet_names = excel_file.sheet_names
+            return FileHandler.workbook_sheets(self.uploaded_file)
         except Exception as e:
             st.error(f"Error reading sheet names: {str(e)}")
-            return {}, {}
-        
-        # Extract data and graphs
-        sheets_data = {}
-        graphs_data = {}
-        
-        # Reset file pointer and load workbook for image/chart extraction
-        excel_data.seek(0)
-        try:
-            # Use data_only=True to get calculated values in cells
-            wb = load_workbook(excel_data, data_only=True)
-            
-            # First process PTA sheet separately
-            if UPLOAD_CONFIG["sheet_name"] in wb.sheetnames:
-                pta_ws = wb[UPLOAD_CONFIG["sheet_name"]]
-                pta_graphs = self._extract_charts_from_sheet(pta_ws)
-                if pta_graphs:
-                    graphs_data["PTA Graphs"] = pta_graphs
-        except Exception as e:
-            st.warning(f"Could not extract graphs from PTA sheet: {str(e)}")
-        
-        # Process all other sheets
-        for sheet_name in sheet_names:
-            try:
-                # Skip PTA sheet - we process it separately
-                if sheet_name == UPLOAD_CONFIG["sheet_name"]:
-                    continue
-                
-                # Reset file pointer before reading each sheet
-                excel_data.seek(0)
-                
-                # Load sheet data
-                df = pd.read_excel(excel_data, sheet_name=sheet_name)
-                sheets_data[sheet_name] = df
-                
-                # Try to extract graphs from this sheet
-                if sheet_name in wb.sheetnames:
-                    sheet_graphs = self._extract_charts_from_sheet(wb[sheet_name])
-                    if sheet_graphs:
-                        # Store graphs with descriptive name
-                        graph_key = f"{sheet_name} Graphs"
-                        graphs_data[graph_key] = sheet_graphs
-                
-            except Exception as e:
-                sheets_data[sheet_name] = f"Error loading sheet: {str(e)}"
-        
-        return sheets_data, graphs_data
+            return None
     
-    def _extract_charts_from_sheet(self, worksheet):
-        """Extract and process images/charts from worksheet"""
-        charts = []
-        
-        # Process all embedded images
+    def _extract_charts_from_sheet(self, sheets, sheet_name):
+        """Thumbnails of the images embedded in a worksheet, cached per upload"""
         try:
-            for image in worksheet._images:
-                try:
-                    # Get image data
-                    img_data = image._data()
-                    if img_data:
-                        # Convert to base64 for displaying in HTML
-                        img_b64 = base64.b64encode(img_data).decode()
-                        # Store image data with metadata for sizing
-                        charts.append({
-                            'data': img_b64,
-                            'width': image.width,
-                            'height': image.height
-                        })
-                except Exception as e:
-                    st.warning(f"Could not extract image: {str(e)}")
+            return sheets.images(sheet_name, self.image_max_width)
         except Exception as e:
             st.warning(f"Error accessing images in worksheet: {str(e)}")
-                
-        return charts
+            return []
     
     # ---- DISPLAY METHODS ----
     
     def display_results(self):
-        """Main method to display analysis results in a tabbed interface"""
+        """Main method to display analysis results, one sheet at a time"""
         if self.new_df.empty or self.res_df.empty:
             st.warning('No data to display.')
             return
         
-        # STEP 1: Extract data and graphs from Excel file
-        sheets_data, graphs_data = self._get_sheets_from_excel()
+        # STEP 1: Open the Excel file (sheet names only)
+        sheets = self._get_sheets_from_excel()
         
         # STEP 2: Create tab names in appropriate order
-        tab_names = self._create_tab_names(sheets_data, graphs_data)
+        tab_names = self._create_tab_names(sheets)
         
-        # STEP 3: Create tabbed interface
-        tabs = st.tabs(tab_names)
+        # STEP 3: Sheet selector - st.tabs would render (and parse) every tab
+        selected = st.radio(
+            'Sheet', tab_names, horizontal=True,
+            key='results_tab', label_visibility='collapsed'
+        )
         
-        # STEP 4: Render content in each tab
-        self._render_tabs_content(tabs, tab_names, sheets_data, graphs_data)
+        # STEP 4: Render the selected tab only
+        self._render_tab_content(selected, tab_names, sheets)
         
         # STEP 5: Add download section below tabs
         self._add_download_section()
     
-    def _create_tab_names(self, sheets_data, graphs_data):
+    def _create_tab_names(self, sheets):
         """Create ordered list of tab names"""
         # Always start with Analysis Results
         tab_names = ["Analysis Results"]
+        if sheets is None:
+            return tab_names
         
         # Add PTA Graphs next if available
-        if "PTA Graphs" in graphs_data:
+        pta_sheet = UPLOAD_CONFIG["sheet_name"]
+        if pta_sheet in sheets.sheet_names and sheets.has_images(pta_sheet):
             tab_names.append("PTA Graphs")
             
         # Add all other sheets
-        sheet_names = list(sheets_data.keys())
+        sheet_names = [name for name in sheets.sheet_names if name != pta_sheet]
         
         # Try to find "Assiette théorique" or similar and place it last
         for special_name in ["Assiette théorique", "Assiette theorique", "Assiette"]:
@@ -189,58 +125,71 @@ class Result:
         
         return tab_names
     
-    def _render_tabs_content(self, tabs, tab_names, sheets_data, graphs_data):
-        """Render content in each tab"""
-        # STEP 1: First tab - Analysis Results with highlighting
-        with tabs[0]:
+    def _render_tab_content(self, sheet_name, tab_names, sheets):
+        """Render the content of the selected tab"""
+        # Analysis Results with highlighting
+        if sheet_name == "Analysis Results":
             self._render_analysis_results()
+            return
             
-        # STEP 2: PTA Graphs tab if it exists
-        tab_index = 1
-        if "PTA Graphs" in graphs_data and len(tab_names) > 1:
-            with tabs[tab_index]:
-                self._display_graphs(graphs_data["PTA Graphs"], "PTA Sheet Graphs")
-            tab_index += 1
+        # PTA Graphs tab
+        if sheet_name == "PTA Graphs":
+            graphs = self._extract_charts_from_sheet(sheets, UPLOAD_CONFIG["sheet_name"])
+            self._display_graphs(graphs, "PTA Sheet Graphs")
+            return
         
-        # STEP 3: Render all other sheets
-        for i, sheet_name in enumerate(tab_names[tab_index:]):
-            with tabs[tab_index + i]:
-                # Display sheet data if available
-                if sheet_name in sheets_data:
-                    sheet_content = sheets_data[sheet_name]
-                    if isinstance(sheet_content, pd.DataFrame):
-                        st.dataframe(sheet_content)
-                    else:
-                        st.error(sheet_content)  # Display error message
-                    
-                    # Special handling for last sheet which might be Assiette théorique
-                    is_last_sheet = (tab_index + i == len(tab_names) - 1)
-                    special_sheet = any(s in sheet_name.lower() for s in ["assiette", "théorique", "theorique"])
-                    
-                    # Add graphs from this sheet if available
-                    graph_key = f"{sheet_name} Graphs"
-                    if graph_key in graphs_data:
-                        title = "Sheet Graphs"
-                        if is_last_sheet and special_sheet:
-                            title = "Assiette Théorique"
-                            # Special display for this important graph
-                            self._display_graphs(graphs_data[graph_key], title, is_special=True)
-                        else:
-                            self._display_graphs(graphs_data[graph_key], title)
-                
-                # Add sheet name caption
-                st.caption(f"Sheet: {sheet_name}")
+        # Any other sheet, parsed on first display and cached per upload
+        try:
+            st.dataframe(FileHandler.load_sheet(self.uploaded_file, sheet_name))
+        except Exception as e:
+            st.error(f"Error loading sheet: {str(e)}")  # Display error message
+        
+        # Special handling for last sheet which might be Assiette théorique
+        is_last_sheet = (sheet_name == tab_names[-1])
+        special_sheet = any(s in sheet_name.lower() for s in ["assiette", "théorique", "theorique"])
+        
+        # Add graphs from this sheet if available
+        if sheets.has_images(sheet_name):
+            graphs = self._extract_charts_from_sheet(sheets, sheet_name)
+            if graphs:
+                if is_last_sheet and special_sheet:
+                    # Special display for this important graph
+                    self._display_graphs(graphs, "Assiette Théorique", is_special=True)
+                else:
+                    self._display_graphs(graphs, "Sheet Graphs")
+        
+        # Add sheet name caption
+        st.caption(f"Sheet: {sheet_name}")
     
     def _render_analysis_results(self):
-        """Render the analysis results with styling in the first tab"""
+        """Render the analysis results, one styled page at a time, in the first tab"""
         # Prepare data
         display_df = self._prepare_display_data()
         
-        # Apply styling
-        styled = display_df.style.apply(self._highlight_row, axis=1)
+        # Filter by change type
+        change_types = sorted(display_df['Change Type'].dropna().unique())
+        selected = st.multiselect(
+            'Filter by Change Type', change_types, default=change_types,
+            key='results_change_filter'
+        )
+        if len(selected) < len(change_types):
+            display_df = display_df[display_df['Change Type'].isin(selected)]
+        
+        # Paginate: only the current page is styled and sent to the browser
+        page_size = DISPLAY_CONFIG["page_size"]
+        n_pages = max(1, -(-len(display_df) // page_size))
+        page = st.number_input(
+            'Page', min_value=1, max_value=n_pages, value=1, step=1,
+            key='results_page'
+        )
+        start = (min(int(page), n_pages) - 1) * page_size
+        page_df = display_df.iloc[start:start + page_size]
         
-        # Display styled dataframe
-        st.dataframe(styled, use_container_width=True)
+        # Apply styling and display the styled page (rendered by st.dataframe)
+        with stage("style"):
+            styled = page_df.style.apply(self._highlight_rows, axis=None)
+            st.dataframe(styled, use_container_width=True)
+        st.caption(f"Rows {min(start + 1, len(display_df))}-{start + len(page_df)} of {len(display_df)} (page {page} of {n_pages})")
         
         # Add color legend
         st.markdown('''
@@ -259,70 +208,50 @@ class Result:
             
         for i, img_info in enumerate(graphs):
             try:
-                img_b64 = img_info['data'] if isinstance(img_info, dict) else img_info
+                # Original dimensions of the image (the data may be a thumbnail)
+                orig_width = img_info['width']
                 
-                # Calculate display size
-                if isinstance(img_info, dict) and 'width' in img_info and 'height' in img_info:
-                    # Get original dimensions
-                    orig_width = img_info['width']
-                    orig_height = img_info['height']
-                    
-                    # Calculate appropriate display width
-                    display_width = min(self.image_max_width, orig_width)
-                    
-                    # Scale height proportionally
-                    if orig_width > 0:  # Avoid division by zero
-                        scale_factor = display_width / orig_width
-                        display_height = int(orig_height * scale_factor)
-                    else:
-                        display_height = orig_height
-                    
-                    # Special handling for important graphs
-                    if is_special:
-                        # Make important graphs more prominent
-                        display_width = min(self.image_max_width, int(orig_width * 1.2))
-                        if orig_width > 0:
-                            scale_factor = display_width / orig_width
-                            display_height = int(orig_height * scale_factor)
-                else:
-                    # Default size if dimensions not available
-                    display_width = "100%"
-                    display_height = None
+                # Calculate appropriate display width
+                display_width = min(self.image_max_width, orig_width)
                 
-                # Display image with appropriate size
-                if display_height:
-                    st.markdown(f"""
-                    <div style="text-align: center; margin: 20px auto;">
-                        <img src="data:image/png;base64,{img_b64}" 
-                             style="width: {display_width}px; height: {display_height}px; max-width: 100%;">
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div style="text-align: center; margin: 20px auto;">
-                        <img src="data:image/png;base64,{img_b64}" 
-                             style="width: {display_width}; max-width: 100%;">
-                    </div>
-                    """, unsafe_allow_html=True)
+                # Special handling for important graphs
+                if is_special:
+                    # Make important graphs more prominent
+                    display_width = min(self.image_max_width, int(orig_width * 1.2))
+                
+                # Streamlit serves the bytes through its media cache
+                st.image(img_info['data'], width=display_width)
             except Exception as e:
                 st.warning(f"Could not display image {i+1}: {str(e)}")
     
+    def _results_key(self):
+        """Identity of the displayed results, used to cache the display view and the report"""
+        old_hash = st.session_state.get('old_file_hash')
+        new_hash = st.session_state.get('new_file_hash')
+        if old_hash and new_hash:
+            return (old_hash, new_hash, st.session_state.get('pta_type'))
+        return (fingerprint_dataframe(self.res_df),)
+    
     def _add_download_section(self):
-        """Add download section for Excel report"""
+        """Add download section for Excel report, built only on request"""
         st.subheader('📥 Download Results')
         try:
-            # Prepare data for export
-            display_df = self._prepare_display_data()
+            key = self._results_key()
+            data = FileHandler.cached_report(key)
             
-            # Generate Excel bytes
-            data = FileHandler.create_excel_bytes(display_df)
+            # The workbook rewrite only runs once the user asks for it
+            if data is None and st.button('🛠️ Prepare Excel Report'):
+                with st.spinner('Preparing the Excel report...'):
+                    data = FileHandler.report_bytes(
+                        self._prepare_display_data(), key, self.uploaded_file
+                    )
             
-            # Add download button
-            st.download_button(
-                '📄 Download Excel Report',
-                data=data,
-                file_name='spring_change_analysis.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            if data is not None:
+                st.download_button(
+                    '📄 Download Excel Report',
+                    data=data,
+                    file_name='spring_change_analysis.xlsx',
+                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
         except Exception as e:
             st.error(f'Error creating Excel file: {e}')
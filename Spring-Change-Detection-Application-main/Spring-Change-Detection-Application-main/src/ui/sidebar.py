@@ -1,5 +1,7 @@
 import streamlit as st
 import streamlit.components.v1 as com
+import pandas as pd
+from utils import profiling
 
 def render_sidebare():
     with st.sidebar:
@@ -80,6 +82,38 @@ def render_sidebare():
                         """)
 
 
+def render_diagnostics():
+    """Stage timings of the recent runs, rendered last so the current run is included"""
+    with st.sidebar:
+        st.divider()
+        st.markdown("### 🩺 Diagnostics")
+        with st.expander("Pipeline timings", expanded=False):
+            trace = st.toggle(
+                "Trace memory (slower)", value=profiling.tracing_memory(),
+                key='diagnostics_trace_memory'
+            )
+            if trace != profiling.tracing_memory():
+                profiling.set_trace_memory(trace)
+
+            rows = profiling.stage_rows()
+            if not rows:
+                st.caption("No stage recorded yet.")
+                return
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    "⬇️ JSON", data=profiling.export_json(),
+                    file_name="pipeline_timings.json", mime="application/json",
+                    key='diagnostics_download'
+                )
+            with col2:
+                if st.button("🗑️ Clear", key='diagnostics_clear'):
+                    profiling.clear()
+                    st.rerun()
+
+
 def is_step_completed(step_key):
     """Check if a workflow step is completed"""
     if step_key == 'upload':    
@@ -2,6 +2,8 @@ import streamlit as st
 from file_handler import FileHandler
 import pandas as pd
 from config import UPLOAD_CONFIG
+from core.compare import invalidate_results
+from core.baseline import pin_baseline, pinned_baseline, unpin_baseline
 
 def render_upload_section():  
     # Prompt user to select PTA type (VP or VU) before file upload
@@ -20,6 +22,17 @@ def render_upload_section():
         
 def _render_old_file():
         st.subheader("Old PTA file:")
+        pta_type = st.session_state.get('pta_type')
+        baseline = pinned_baseline(pta_type)
+        if baseline is not None and st.toggle(f"📌 Use the pinned {pta_type} baseline", key="use_baseline"):
+            _use_baseline(baseline)
+            return
+        if st.session_state.get('baseline_in_use'):
+            # back to uploads: forget the baseline rows
+            st.session_state['baseline_in_use'] = False
+            st.session_state['input_excel_old'] = None
+            _set_file_hash(None, "old")
+
         old_file = st.file_uploader(
             label = "Upload excel file only",
             type = UPLOAD_CONFIG["allowed_extension"],
@@ -28,6 +41,29 @@ def _render_old_file():
         
         if old_file:
             _process_upload_file(old_file, "old", "input_excel_old")
+            if st.session_state.get('input_excel_old') is not None and \
+                    st.button(f"📌 Pin as {pta_type} baseline", key="pin_baseline"):
+                pin_baseline(
+                    st.session_state['input_excel_old'], pta_type, old_file.name,
+                    st.session_state.get('old_file_hash')
+                )
+                st.success(f"✅ {old_file.name} pinned as the {pta_type} baseline")
+
+
+def _use_baseline(baseline):
+    """
+    Use the pinned baseline as the old PTA: its cleaned rows replace the
+    old upload and its digest the old file hash.
+    """
+    st.session_state['input_excel_old'] = baseline.frame
+    st.session_state['baseline_in_use'] = True
+    if 'old_file_object' in st.session_state:
+        del st.session_state['old_file_object']
+    _set_file_hash(baseline.digest, "old")
+    st.caption(f"{baseline.name}: {baseline.rows} rows, pinned {baseline.pinned_at}")
+    if st.button("Unpin baseline", key="unpin_baseline"):
+        unpin_baseline(baseline.pta_type)
+        st.rerun()
 
 @staticmethod 
 def _render_new_file():
@@ -48,7 +84,9 @@ def _process_upload_file(file, type_file, session_key):
     - else display a commnet error returned from validate_excel_file
     """
     try:
-        is_valid, comment, df = FileHandler.validate_excel_file(file, type_file)
+        is_valid, comment, df = FileHandler.validate_excel_file(
+            file, type_file, FileHandler.projection(st.session_state.get('pta_type'))
+        )
         
         if is_valid: 
             st.success(f"✅ {type_file.title()} file uploaded seccussfully")
@@ -59,20 +97,41 @@ def _process_upload_file(file, type_file, session_key):
             # Store the original file object too for later use
             # Use a different name than the widget key to avoid conflicts
             st.session_state[type_file + '_file_object'] = file
+            _store_file_hash(file, type_file)
                 
-            #displaying the df
-            with st.expander(f"Preview {type_file.title()} File data"):
-                st.dataframe(df)
+            #displaying the df (the full sheet is only parsed when asked for)
+            if st.toggle(f"Preview {type_file.title()} File data", key=f"preview_{type_file}"):
+                st.dataframe(FileHandler.load_full(file))
         else:
             st.error(f"❌{comment}")
             st.session_state[session_key] = None
             # Use a different name than the widget key
             if type_file + '_file_object' in st.session_state:
                 del st.session_state[type_file + '_file_object']
+            _store_file_hash(None, type_file)
             
     except Exception as e:
         st.error(f"Error processing the {type_file.title()} file\n error:{str(e)}")
         st.session_state[session_key]= None
         # Use a different name than the widget key
         if type_file + '_file_object' in st.session_state:
-            del st.session_state[type_file + '_file_object']
\ No newline at end of file
+            del st.session_state[type_file + '_file_object']
+        _store_file_hash(None, type_file)
+
+
+def _store_file_hash(file, type_file):
+    """
+    Keep the content hash of the current upload in the session state and
+    drop the cached comparisons of the file it replaces.
+    """
+    _set_file_hash(FileHandler.content_hash(file) if file is not None else None, type_file)
+
+
+def _set_file_hash(current, type_file):
+    """Set the hash of an input, dropping the cached results of the previous one."""
+    hash_key = type_file + '_file_hash'
+    previous = st.session_state.get(hash_key)
+    if previous is not None and previous != current:
+        invalidate_results(previous)
+        FileHandler.invalidate_reports(previous)
+    st.session_state[hash_key] = current
@@ -0,0 +1,121 @@
+"""
+Small thread-safe LRU cache shared by the processing layers.
+
+Streamlit runs every session in its own thread of the same process, so a
+module level LRUCache is shared across reruns and across sessions.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest of raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and/or total size.
+
+    Args:
+        max_entries: Maximum number of entries kept (None for no limit).
+        max_bytes: Memory budget for all entries (None for no limit).
+        sizeof: Callable returning the size in bytes of a cached value,
+            required when max_bytes is set.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("'sizeof' is required when 'max_bytes' is set.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: dict = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it as recently used."""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if needed."""
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            # a single value larger than the whole budget is never cached
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drop every entry whose key matches the predicate.
+
+        Returns:
+            Number of removed entries.
+        """
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of all cached values as reported by sizeof."""
+        return self._total_bytes
+
+    def _remove(self, key: Hashable) -> None:
+        del self._data[key]
+        self._total_bytes -= self._sizes.pop(key)
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._data)))
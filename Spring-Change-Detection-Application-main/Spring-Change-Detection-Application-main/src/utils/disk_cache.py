@@ -0,0 +1,283 @@
+"""
+Persistent cache of DataFrames on disk, shared across restarts and processes.
+
+Frames are stored as uncompressed Feather (Arrow IPC) files and read back
+through a memory map, so reloading a cached frame costs little more than
+building the pandas columns: numeric columns without missing values are
+used without copying. Object columns mixing text and numbers are stored as
+text plus a type tag per value; frames Arrow still cannot round-trip
+exactly (non-string labels, exotic cell types...) are not stored at all and
+stay in the in-memory caches only. Nothing is ever unpickled, so a file
+planted in the directory cannot run code.
+
+The directory is bounded by a total size; the least recently used files
+(by modification time, refreshed on every hit) are deleted first.
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+_SUFFIX = ".feather"
+# schema metadata: positions of the object columns whose missing values are
+# NaN, and of the mixed-type object columns stored as text + type tag
+_LAYOUT = b"frame_layout"
+_TAG_PREFIX = "__type_tag_"
+
+# type tags of the values of a mixed-type object column, with their decoder
+_TAGS = {type(None): 0, str: 1, int: 2, float: 3, bool: 4, datetime: 5, pd.Timestamp: 6}
+_DECODERS = {
+    2: int,
+    3: float,
+    4: lambda text: text == "True",
+    5: datetime.fromisoformat,
+    6: pd.Timestamp,
+}
+
+
+def _encode_mixed(values: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Text and type tag of every value of an object column, None when a value
+    has a type Arrow text cannot carry back (see _TAGS).
+    """
+    try:
+        tags = np.fromiter((_TAGS[type(value)] for value in values), dtype=np.int8, count=len(values))
+    except KeyError:
+        return None
+    text = np.array(
+        ["" if value is None else value.isoformat() if isinstance(value, datetime) else str(value)
+         for value in values],
+        dtype=object
+    )
+    return text, tags
+
+
+def _decode_mixed(text: np.ndarray, tags: np.ndarray) -> np.ndarray:
+    """Values of an object column from its text and type tags (see _encode_mixed)."""
+    values = np.empty(len(text), dtype=object)
+    strings = tags == 1
+    values[strings] = text[strings]
+    for tag, decode in _DECODERS.items():
+        rows = np.flatnonzero(tags == tag)
+        if len(rows):
+            decoded = np.empty(len(rows), dtype=object)
+            decoded[:] = [decode(item) for item in text[rows]]
+            values[rows] = decoded
+    return values
+
+
+#__TODO: Feather files_______________________________________________
+def read_feather(path: Path) -> pd.DataFrame:
+    """Read a frame written by write_feather (memory-mapped)."""
+    from pyarrow import feather
+    table = feather.read_table(path, memory_map=True)
+    layout = json.loads((table.schema.metadata or {}).get(_LAYOUT, b"{}"))
+    mixed = layout.get("mixed_columns", [])
+    tags = {position: table.column(f"{_TAG_PREFIX}{position}").to_numpy() for position in mixed}
+    if mixed:
+        table = table.drop_columns([f"{_TAG_PREFIX}{position}" for position in mixed])
+    df = table.to_pandas(split_blocks=True)
+
+    # Arrow nulls come back as None, restore the NaN of the columns that had them
+    for position in layout.get("nan_columns", []):
+        values = df.iloc[:, position].to_numpy()
+        df.isetitem(position, np.where(pd.isna(values), np.nan, values))
+    for position in mixed:
+        df.isetitem(position, _decode_mixed(df.iloc[:, position].to_numpy(), tags[position]))
+    return df
+
+
+def write_feather(path: Path, df: pd.DataFrame) -> bool:
+    """
+    Write a frame as uncompressed Feather (atomically) if it round-trips
+    exactly, False otherwise, leaving nothing at path.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+    except ImportError:
+        return False
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        return False
+
+    frame = df
+    layout = {"nan_columns": [], "mixed_columns": []}
+    tag_columns = {}
+    for position, dtype in enumerate(df.dtypes):
+        if dtype != object:
+            continue
+        values = df.iloc[:, position].to_numpy()
+        if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+            missing = values[pd.isna(values)]
+            if not len(missing) or np.equal(missing, None).all():
+                continue
+            if all(isinstance(value, float) for value in missing):
+                layout["nan_columns"].append(position)
+                continue
+        # numbers mixed with text, or None/NaN mixes: text + type tag
+        encoded = _encode_mixed(values)
+        if encoded is None:
+            return False
+        if frame is df:
+            frame = df.copy(deep=False)
+        frame.isetitem(position, encoded[0])
+        tag_columns[f"{_TAG_PREFIX}{position}"] = encoded[1]
+        layout["mixed_columns"].append(position)
+
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        for name, tags in tag_columns.items():
+            table = table.append_column(name, pa.array(tags))
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), _LAYOUT: json.dumps(layout).encode()}
+        )
+        _write_atomic(path, lambda f: feather.write_feather(table, f, compression="uncompressed"))
+        back = read_feather(path)
+        if back.equals(df) and _same_dtypes(df, back):
+            return True
+    except Exception:
+        pass
+    _unlink(path)
+    return False
+
+
+def _same_dtypes(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    return list(left.columns) == list(right.columns) and left.dtypes.equals(right.dtypes)
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Write to a temporary file of the directory, then rename it into place."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        _unlink(Path(tmp))
+        raise
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+#__TODO: Cache directory_______________________________________________
+class DiskFrameCache:
+    """
+    Least-recently-used DataFrame cache in a directory.
+
+    Args:
+        directory: Directory holding the cached files, created on first write.
+        max_bytes: Size budget of the directory (None for no limit).
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached frame and mark it as recently used, None on a miss."""
+        path = self._path(key)
+        try:
+            df = read_feather(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # truncated or unreadable entry: drop it and recompute
+            self._unlink(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """
+        Store a frame (atomically), then evict down to the size budget.
+
+        Returns:
+            False when Feather cannot round-trip the frame, which is then
+            not cached on disk.
+        """
+        self._ensure_directory()
+        if not write_feather(self._path(key), df):
+            return False
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used files until the directory fits max_bytes.
+
+        Returns:
+            Number of deleted files.
+        """
+        if self.max_bytes is None:
+            return 0
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                self._unlink(path)
+                total -= size
+                removed += 1
+            return removed
+
+    def clear(self) -> None:
+        """Delete every cached file."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._unlink(path)
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of all cached files."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def _entries(self) -> List[Tuple[Path, int, float]]:
+        """Cached files as (path, size, mtime), oldest first."""
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for path in self.directory.iterdir():
+            if path.suffix != _SUFFIX:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def _ensure_directory(self) -> None:
+        if not self.directory.is_dir():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # keep the cache out of version control
+            (self.directory / ".gitignore").write_text("*\n", encoding="utf-8")
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        _unlink(path)
@@ -0,0 +1,189 @@
+"""
+Stage timing and memory instrumentation of the processing pipeline.
+
+A stage is timed with `stage(name)`, used as a context manager or a decorator:
+
+    with stage("export"):
+        ...
+
+    @stage("clean")
+    def clean_dataframe(df): ...
+
+Every stage records its wall time and, while memory tracing is on, the
+tracemalloc peak above the memory in use when it started plus the memory it
+left allocated. Stages entered inside another stage become its children; an
+outermost stage is one run, kept in a bounded history shared by every
+session of the process (PROFILING_CONFIG["max_runs"]).
+
+tracemalloc traces the whole process: when several sessions work at the
+same time, the memory figures include the allocations of the other threads.
+"""
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import PROFILING_CONFIG
+
+_RUNS: deque = deque(maxlen=PROFILING_CONFIG["max_runs"])
+_LOCK = threading.Lock()
+# open stages of the current thread, innermost last
+_LOCAL = threading.local()
+_trace_memory: bool = PROFILING_CONFIG["trace_memory"]
+
+
+def _open_stages() -> List[Optional[Dict[str, Any]]]:
+    if not hasattr(_LOCAL, "stack"):
+        _LOCAL.stack = []
+    return _LOCAL.stack
+
+
+class stage:
+    """
+    Time a pipeline stage (context manager or decorator).
+
+    Entering the context returns the stage record, a dict with 'stage',
+    'started_at', 'seconds', 'children' and, while memory tracing is on,
+    'peak_memory_bytes' and 'memory_delta_bytes' (None when profiling is
+    disabled). The record is complete once the context exits.
+
+    Args:
+        name: Name of the stage, e.g. "read_excel" or "export".
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with stage(self.name):
+                return func(*args, **kwargs)
+        return timed
+
+    def __enter__(self) -> Optional[Dict[str, Any]]:
+        stack = _open_stages()
+        if not PROFILING_CONFIG["enabled"]:
+            stack.append(None)
+            return None
+
+        record: Dict[str, Any] = {
+            "stage": self.name,
+            "started_at": datetime.now().isoformat(timespec="milliseconds"),
+            "seconds": None,
+            "children": [],
+        }
+        frame = {"record": record, "memory_start": None, "peak": 0}
+        if _trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            # the parent keeps the peak reached so far before it is reset
+            parent = stack[-1] if stack else None
+            if parent is not None and parent["memory_start"] is not None:
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["memory_start"] = current
+        stack.append(frame)
+        frame["start"] = time.perf_counter()
+        return record
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter()
+        stack = _open_stages()
+        frame = stack.pop()
+        if frame is None:
+            return False
+
+        record = frame["record"]
+        record["seconds"] = round(elapsed - frame["start"], 6)
+        parent = stack[-1] if stack else None
+        if frame["memory_start"] is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["peak"])
+            record["peak_memory_bytes"] = peak - frame["memory_start"]
+            record["memory_delta_bytes"] = current - frame["memory_start"]
+            if parent is not None and parent["memory_start"] is not None:
+                parent["peak"] = max(parent["peak"], peak)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        if parent is not None:
+            parent["record"]["children"].append(record)
+        else:
+            with _LOCK:
+                _RUNS.append(record)
+        return False
+
+
+#__TODO: Memory tracing switch_______________________________________________
+def tracing_memory() -> bool:
+    """Whether new stages record their peak memory."""
+    return _trace_memory
+
+
+def set_trace_memory(enabled: bool) -> None:
+    """Turn the tracemalloc measurement of new stages on or off."""
+    global _trace_memory
+    _trace_memory = enabled
+    if not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+#__TODO: Recorded runs_______________________________________________
+def runs() -> List[Dict[str, Any]]:
+    """Recorded runs, oldest first."""
+    with _LOCK:
+        return list(_RUNS)
+
+
+def clear() -> None:
+    """Forget every recorded run."""
+    with _LOCK:
+        _RUNS.clear()
+
+
+def stage_rows(records: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Flatten runs into one row per stage for tabular display, newest run
+    first, children indented under their parent.
+
+    Args:
+        records: Runs to flatten, every recorded run if None.
+
+    Returns:
+        Rows with 'run', 'stage', 'seconds' and, when traced, 'peak MB' and
+        'delta MB'.
+    """
+    records = runs() if records is None else records
+    rows: List[Dict[str, Any]] = []
+
+    def visit(record: Dict[str, Any], run: int, depth: int) -> None:
+        row = {"run": run, "stage": "  " * depth + record["stage"], "seconds": record["seconds"]}
+        if "peak_memory_bytes" in record:
+            row["peak MB"] = round(record["peak_memory_bytes"] / 1024 ** 2, 2)
+            row["delta MB"] = round(record["memory_delta_bytes"] / 1024 ** 2, 2)
+        rows.append(row)
+        for child in record["children"]:
+            visit(child, run, depth + 1)
+
+    for run in range(len(records), 0, -1):
+        visit(records[run - 1], run, 0)
+    return rows
+
+
+def export_json(records: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    Recorded runs as a JSON document, to archive the timings of a session
+    and compare them across releases.
+    """
+    payload = {
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+        "trace_memory": _trace_memory,
+        "runs": runs() if records is None else records,
+    }
+    return json.dumps(payload, indent=2, ensure_ascii=False)
@@ -9,6 +9,9 @@ class SessionStateManager:
         "input_excel_old": None,
         "input_excel_new": None,
         "old_uploaded": False,
+        "old_file_hash": None,
+        "baseline_in_use": False,
+        "new_file_hash": None,
         "results": None,
         "analysis_completed": False,
         "pta_type": None,
@@ -0,0 +1,70 @@
+"""
+A pinned baseline compares like generate_results_df(baseline, new), before
+and after a reload from its manifest, Feather and .npy files.
+"""
+import pandas as pd
+import pytest
+
+from config import VP_COLUMNS_KEY, VU_COLUMNS_KEY
+from core import baseline as baselines
+from core.compare import generate_results_df, invalidate_results, prepare_side
+from test_compare import make_pair
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """An empty baseline directory, and no baseline loaded in memory."""
+    monkeypatch.setitem(baselines.BASELINE_CONFIG, "directory", tmp_path)
+    monkeypatch.setattr(baselines, "_LOADED", {})
+    return tmp_path
+
+
+def make_case(case: str, pta_type: str):
+    old, new = make_pair(1200, pta_type, 11)
+    if case == "all_new":
+        keys = VP_COLUMNS_KEY if pta_type == "VP" else VU_COLUMNS_KEY
+        new[keys[0]] = "brand new"
+    elif case == "unchanged":
+        new = old.copy()
+    elif case == "empty_new":
+        new = new.iloc[0:0]
+    return old, new
+
+
+#__TODO: Tests_________________________________
+@pytest.mark.parametrize("pta_type", ["VP", "VU"])
+@pytest.mark.parametrize("case", ["duplicates_and_new", "all_new", "unchanged", "empty_new"])
+def test_baseline_matches_generate_results_df(registry, case, pta_type):
+    old, new = make_case(case, pta_type)
+    baseline = baselines.pin_baseline(old, pta_type, "old.xlsx")
+    assert baseline.sorted_keys is not None
+
+    result = baseline.compare(prepare_side(new, pta_type, "new"))
+    pd.testing.assert_frame_equal(result, generate_results_df(old, new, pta_type))
+
+
+@pytest.mark.parametrize("pta_type", ["VP", "VU"])
+def test_reloaded_baseline_matches_generate_results_df(registry, pta_type):
+    old, new = make_case("duplicates_and_new", pta_type)
+    pinned = baselines.pin_baseline(old, pta_type, "old.xlsx", digest="baseline-digest")
+    manifest = baselines._read_manifest(pta_type)
+    data = registry / manifest["data"]
+    assert {path.name for path in data.iterdir()} == {"frame.feather", "order.npy", "sorted_keys.npy"}
+
+    # another process: nothing loaded in memory, only the files
+    baselines._LOADED.clear()
+    reloaded = baselines.pinned_baseline(pta_type)
+    assert reloaded is not None and reloaded is not pinned
+    assert (reloaded.digest, reloaded.keys, reloaded.radix) == (pinned.digest, pinned.keys, pinned.radix)
+
+    expected = generate_results_df(old, new, pta_type)
+    pd.testing.assert_frame_equal(reloaded.compare(prepare_side(new, pta_type, "new")), expected)
+    try:
+        cached = baselines.compare_with_baseline_cached(reloaded, new, f"test-new-{pta_type}")
+    finally:
+        invalidate_results("baseline-digest")
+    pd.testing.assert_frame_equal(cached, expected)
+
+    assert baselines.unpin_baseline(pta_type)
+    assert baselines.pinned_baseline(pta_type) is None
+    assert not data.exists()
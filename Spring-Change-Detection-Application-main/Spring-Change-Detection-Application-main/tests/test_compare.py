@@ -0,0 +1,208 @@
+"""
+Regression tests of the comparison engine against the original row-wise
+implementation of generate_results_df.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import REQUIRED_COLUMNS, VP_COLUMNS_KEY, VU_COLUMNS_KEY
+from core.compare import generate_results_df
+
+
+#__TODO: Reference implementation (row-wise apply)_________________________________
+def reference_clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col in df.columns:
+        s = df[col]
+        if s.dropna().astype(str).str.upper().isin({'X'}).all():
+            df[col] = s.astype(str).str.upper().eq('X').astype(int)
+        elif pd.api.types.is_object_dtype(s):
+            df[col] = s.fillna('').astype(str).str.strip().str.lower()
+        else:
+            df[col] = s.fillna(0)
+    return df
+
+
+def reference_results_df(old_df: pd.DataFrame, new_df: pd.DataFrame, pta_type: str = "VP") -> pd.DataFrame:
+    old = old_df.copy()
+    new = new_df.copy()
+    old["__old_id"] = old.index + 3
+    new["__new_id"] = new.index + 3
+    old = reference_clean_dataframe(old)
+    new = reference_clean_dataframe(new)
+
+    keys = VP_COLUMNS_KEY if pta_type == "VP" else VU_COLUMNS_KEY
+    keys = [k for k in keys if k in old.columns and k in new.columns]
+    old['__seq'] = old.groupby(keys).cumcount()
+    new['__seq'] = new.groupby(keys).cumcount()
+
+    merged = pd.merge(old, new, on=keys + ['__seq'], how="outer", suffixes=("_old", "_new"), indicator=True)
+
+    ref_old = f"{REQUIRED_COLUMNS['reference']}_old"
+    ref_new = f"{REQUIRED_COLUMNS['reference']}_new"
+    mass_old = f"{REQUIRED_COLUMNS['mass']}_old"
+    mass_new = f"{REQUIRED_COLUMNS['mass']}_new"
+    for col in (ref_old, ref_new):
+        merged[col] = (
+            merged.get(col, "").fillna("").astype(str)
+            .str.replace(r"\.0$", "", regex=True).str.strip()
+        )
+    merged[mass_old] = merged.get(mass_old, 0).fillna(0).astype(float)
+    merged[mass_new] = merged.get(mass_new, 0).fillna(0).astype(float)
+
+    merged["Mass Difference"] = merged[mass_new] - merged[mass_old]
+    merged["Mass Status"] = merged["Mass Difference"].apply(
+        lambda d: "Increased" if d > 0 else ("Decreased" if d < 0 else "Unchanged")
+    )
+    merged["Reference Status"] = merged.apply(
+        lambda r: "Change" if r[ref_old] != r[ref_new] else "No Change", axis=1
+    )
+
+    def classify(row: pd.Series) -> str:
+        if row["_merge"] == "right_only":
+            return "New"
+        return "Spring Changed" if row[ref_old] != row[ref_new] else "Unchanged"
+
+    merged["Change Type"] = merged.apply(classify, axis=1)
+    merged = merged[merged["_merge"] != "left_only"]
+
+    result_cols = keys + [
+        ref_new, ref_old, mass_new, mass_old,
+        'Mass Difference', 'Mass Status', 'Reference Status', 'Change Type',
+        '__new_id', '__old_id'
+    ]
+    result_df = merged[result_cols].rename(columns={
+        ref_new: 'New Reference',
+        ref_old: 'Old Reference',
+        mass_new: 'New Mass',
+        mass_old: 'Old Mass',
+        '__new_id': 'Cell ID New',
+        '__old_id': 'Cell ID Old'
+    })
+    return result_df.sort_values('Cell ID New', ascending=True).reset_index(drop=True)
+
+
+#__TODO: Synthetic PTA revisions_________________________________
+def make_pair(rows: int, pta_type: str, seed: int, deleted: float = 0.05, added: float = 0.05):
+    """
+    Old/new PTA pair with duplicate keys, NaN masses, mixed-type references,
+    changed references, deleted cars and new cars.
+    """
+    rng = np.random.default_rng(seed)
+    keys = VP_COLUMNS_KEY if pta_type == "VP" else VU_COLUMNS_KEY
+    data = {}
+    for i, key in enumerate(keys):
+        if i < 3:
+            # few distinct values: many rows share their composite key
+            data[key] = rng.choice([" Val1 ", "VAL2", "val3", "Val4"], rows)
+        else:
+            data[key] = rng.choice(np.array(["X", None], dtype=object), rows)
+    data[REQUIRED_COLUMNS["mass"]] = rng.choice([1000.0, 1100.5, np.nan, 1200.0], rows)
+    data[REQUIRED_COLUMNS["reference"]] = rng.choice(np.array([123.0, 456.0, "AB12", None, "789"], dtype=object), rows)
+    data["Option"] = rng.choice(np.array(["a", "B ", None, 3], dtype=object), rows)
+    old = pd.DataFrame(data)
+
+    new = old.sample(frac=1 - deleted, random_state=seed).reset_index(drop=True)
+    changed = rng.random(len(new)) < 0.1
+    new.loc[changed, REQUIRED_COLUMNS["reference"]] = "CHG"
+    heavier = rng.random(len(new)) < 0.1
+    new.loc[heavier, REQUIRED_COLUMNS["mass"]] = 1300.0
+    extra = old.sample(frac=added, random_state=seed + 1).copy()
+    extra[keys[0]] = "brand new"
+    new = pd.concat([new, extra], ignore_index=True)
+    return old, new
+
+
+#__TODO: Tests_________________________________
+@pytest.mark.parametrize("pta_type", ["VP", "VU"])
+@pytest.mark.parametrize("seed, rows, deleted, added", [
+    (0, 500, 0.05, 0.05),
+    (1, 2000, 0.05, 0.05),
+    (2, 800, 0.0, 0.05),
+    (3, 800, 0.05, 0.0),
+    (4, 800, 0.0, 0.0),
+    # every car deleted: empty new sheet
+    (5, 300, 1.0, 0.0),
+])
+def test_matches_row_wise_reference(pta_type, seed, rows, deleted, added):
+    old, new = make_pair(rows, pta_type, seed, deleted, added)
+    expected = reference_results_df(old, new, pta_type)
+    result = generate_results_df(old, new, pta_type)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("pta_type", ["VP", "VU"])
+def test_covers_every_change_type(pta_type):
+    old, new = make_pair(2000, pta_type, 7)
+    result = generate_results_df(old, new, pta_type)
+    assert set(result["Change Type"]) == {"New", "Spring Changed", "Unchanged"}
+    assert set(result["Mass Status"]) == {"Increased", "Decreased", "Unchanged"}
+    # deleted cars are not part of the result
+    assert len(result) == len(new)
+    assert result["Cell ID Old"].notna().sum() < len(old)
+
+
+@pytest.mark.parametrize("pta_type", ["VP", "VU"])
+def test_empty_old_sheet_gives_new_rows(pta_type):
+    old, new = make_pair(300, pta_type, 5)
+    empty = old.iloc[0:0]
+    result = generate_results_df(empty, new, pta_type)
+    assert (result["Change Type"] == "New").all()
+    assert len(result) == len(new)
+    pd.testing.assert_frame_equal(result, reference_results_df(empty, new, pta_type))
+
+
+@pytest.mark.parametrize("engine", ["chunked", "parallel"])
+@pytest.mark.parametrize("empty", [None, "old", "new"])
+def test_engines_match_reference(engine, empty):
+    from core.compare import generate_results_chunked, generate_results_parallel
+
+    old, new = make_pair(600, "VP", 10)
+    if empty == "old":
+        old = old.iloc[0:0]
+    elif empty == "new":
+        new = new.iloc[0:0]
+    if engine == "chunked":
+        result = generate_results_chunked(old, new, "VP", n_partitions=4)
+    else:
+        result = generate_results_parallel(old, new, "VP", max_workers=2, n_partitions=4)
+    pd.testing.assert_frame_equal(result, reference_results_df(old, new, "VP"))
+
+
+def test_missing_old_key_column_gives_new_rows():
+    old, new = make_pair(300, "VP", 6)
+    old[VP_COLUMNS_KEY[0]] = None
+    result = generate_results_df(old, new, "VP")
+    assert (result["Change Type"] == "New").all()
+    assert len(result) == len(new)
+
+
+@pytest.mark.parametrize("engine", ["chunked", "parallel"])
+def test_large_input_engines_reuse_prepared_sides(engine, monkeypatch):
+    from core import compare
+
+    monkeypatch.setitem(compare.COMPARISON_CONFIG, "parallel", engine == "parallel")
+    monkeypatch.setitem(compare.COMPARISON_CONFIG, "max_workers", 2)
+    monkeypatch.setitem(compare.COMPARISON_CONFIG, "chunked_min_rows", 0)
+    prepared = []
+    prepare_side = compare.prepare_side
+
+    def counting_prepare_side(df, pta_type, side, kinds=None):
+        prepared.append(side)
+        return prepare_side(df, pta_type, side, kinds)
+
+    monkeypatch.setattr(compare, "prepare_side", counting_prepare_side)
+    old, new = make_pair(1500, "VU", 8)
+    other_new = make_pair(1500, "VU", 9)[1]
+    fingerprint = f"test-{engine}"
+    try:
+        first = compare.compare_cached(old, new, "VU", fingerprint, f"{fingerprint}-new")
+        second = compare.compare_cached(old, other_new, "VU", fingerprint, f"{fingerprint}-other")
+    finally:
+        compare.invalidate_results(fingerprint)
+
+    # the unchanged old side is prepared once
+    assert prepared == ["old", "new", "new"]
+    pd.testing.assert_frame_equal(first, reference_results_df(old, new, "VU"))
+    pd.testing.assert_frame_equal(second, reference_results_df(old, other_new, "VU"))
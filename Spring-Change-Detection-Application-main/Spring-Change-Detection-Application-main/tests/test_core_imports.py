@@ -0,0 +1,22 @@
+"""
+The core package must stay importable without the UI and report libraries,
+so worker processes and the command line runner start cheaply.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_core_does_not_import_ui_or_report_libraries():
+    script = (
+        "import json, sys\n"
+        "import cli, core, core.baseline, core.compare, core.export, core.history, core.ingest\n"
+        "print(json.dumps(sorted(m for m in ('streamlit', 'plotly', 'openpyxl') if m in sys.modules)))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=SRC, capture_output=True, text=True, check=True
+    ).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
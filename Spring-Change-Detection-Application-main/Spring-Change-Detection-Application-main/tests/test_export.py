@@ -0,0 +1,78 @@
+"""
+Tests of the highlighted report written by patching the xlsx package.
+"""
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from config import UPLOAD_CONFIG
+from core.export import HIGHLIGHT_COLORS, _create_report_openpyxl, _create_report_xml, highlight_index
+from core.ingest import _sheet_paths
+
+
+#__TODO: Synthetic workbook and results_________________________________
+def make_workbook(rows: int, seed: int = 0) -> bytes:
+    """PTA workbook (header, description row, rows of data) plus a second sheet."""
+    rng = np.random.default_rng(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = UPLOAD_CONFIG["sheet_name"]
+    ws.append(["Moteur", "Boite", "Niveau", "Référence", "Masse"])
+    ws.append(["engine", "gearbox", "trim", "spring", "mass"])
+    for _ in range(rows):
+        ws.append([
+            str(rng.choice(["EB2", "DV5", "EP6"])), str(rng.choice(["BVM6", "EAT8"])),
+            str(rng.choice(["Active", "Allure", "GT"])), int(rng.integers(100000, 999999)),
+            float(rng.choice([1200.0, 1250.5, 1310.0])),
+        ])
+    wb.create_sheet("Notes").append(["kept as is"])
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def make_results(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Cell ID New': np.arange(rows) + 3,
+        'Change Type': rng.choice(["Unchanged", "New", "Spring Changed"], rows, p=[0.8, 0.1, 0.1]),
+    })
+
+
+def sheet_fills(data: bytes) -> list:
+    ws = load_workbook(io.BytesIO(data))[UPLOAD_CONFIG["sheet_name"]]
+    return [
+        ([cell.value for cell in row], {cell.fill.fgColor.rgb for cell in row})
+        for row in ws.iter_rows()
+    ]
+
+
+#__TODO: Tests_________________________________
+@pytest.mark.parametrize("rows", [50, 3000])
+def test_xml_report_matches_openpyxl_report(rows):
+    data = make_workbook(rows)
+    row_colors = highlight_index(make_results(rows))
+    assert set(row_colors.values()) == set(HIGHLIGHT_COLORS.values())
+
+    patched = _create_report_xml(data, row_colors)
+    expected = _create_report_openpyxl(data, row_colors)
+    assert sheet_fills(patched) == sheet_fills(expected)
+    assert load_workbook(io.BytesIO(patched)).sheetnames == [UPLOAD_CONFIG["sheet_name"], "Notes"]
+
+
+def test_xml_report_is_compressed():
+    rows = 3000
+    data = make_workbook(rows)
+    row_colors = highlight_index(make_results(rows))
+    patched = _create_report_xml(data, row_colors)
+    expected = _create_report_openpyxl(data, row_colors)
+
+    with zipfile.ZipFile(io.BytesIO(patched)) as archive:
+        sheet = archive.getinfo(_sheet_paths(archive)[UPLOAD_CONFIG["sheet_name"]])
+        assert sheet.compress_type == zipfile.ZIP_DEFLATED
+        assert sheet.compress_size < sheet.file_size / 4
+    assert len(patched) < 1.25 * len(expected)
@@ -0,0 +1,93 @@
+"""
+The history of a chain of revisions against pairwise generate_results_df,
+and its one-row-per-configuration summary.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import REQUIRED_COLUMNS
+from core.compare import generate_results_df
+from core.history import generate_history, summarize_history
+from test_compare import make_pair
+
+RESULT_COLUMNS = [
+    'New Reference', 'Old Reference', 'New Mass', 'Old Mass', 'Mass Difference',
+    'Mass Status', 'Reference Status', 'Change Type',
+]
+
+
+def make_chain(rows: int, pta_type: str, seed: int, revisions: int = 4) -> list:
+    """
+    Revisions with deleted, new and re-added cars (seen two revisions
+    before), changed references and masses.
+    """
+    rng = np.random.default_rng(seed)
+    chain = list(make_pair(rows, pta_type, seed))
+    while len(chain) < revisions:
+        new = chain[-1].sample(frac=0.95, random_state=seed + len(chain)).reset_index(drop=True)
+        changed = rng.random(len(new)) < 0.05
+        new.loc[changed, REQUIRED_COLUMNS["reference"]] = rng.choice(
+            np.array(["R1", 5.0, None], dtype=object), int(changed.sum())
+        )
+        heavier = rng.random(len(new)) < 0.05
+        new.loc[heavier, REQUIRED_COLUMNS["mass"]] = rng.choice([900.0, np.nan], int(heavier.sum()))
+        back = chain[-2].sample(frac=0.04, random_state=seed + 100 + len(chain))
+        chain.append(pd.concat([new, back], ignore_index=True))
+    return chain
+
+
+#__TODO: Tests_________________________________
+@pytest.mark.parametrize("pta_type", ["VP", "VU"])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_history_matches_pairwise_results(pta_type, seed):
+    revisions = make_chain(800, pta_type, seed)
+    history = generate_history(revisions, pta_type)
+
+    for position in range(1, len(revisions)):
+        expected = generate_results_df(revisions[position - 1], revisions[position], pta_type)
+        expected = expected[
+            (expected['Change Type'] != "Unchanged") | (expected['Mass Status'] != "Unchanged")
+        ].reset_index(drop=True)
+        changes = history[history['Revision'] == str(position + 1)].reset_index(drop=True)
+        assert (changes['Previous Revision'] == str(position)).all()
+
+        keys = list(expected.columns[:expected.columns.get_loc('New Reference')])
+        assert list(changes.columns[:len(keys) + 3]) == keys + ['Configuration', 'Revision', 'Previous Revision']
+        pd.testing.assert_frame_equal(
+            changes[keys + RESULT_COLUMNS], expected[keys + RESULT_COLUMNS], check_dtype=False
+        )
+        # ids are float in the pairwise result whenever a car was deleted
+        for column in ('Cell ID New', 'Cell ID Old'):
+            np.testing.assert_array_equal(
+                changes[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float)
+            )
+
+
+def test_summarize_history():
+    keys = ['Moteur', 'Boite']
+    changes = pd.DataFrame({
+        'Moteur': ["eb2", "eb2", "dv5", "eb2", "dv5", "ep6"],
+        'Boite': ["bvm6", "bvm6", "eat8", "bvm6", "eat8", "eat8"],
+        'Configuration': [0, 0, 1, 0, 1, 2],
+        'Revision': ["B", "C", "C", "D", "D", "D"],
+        'Previous Revision': ["A", "B", "B", "C", "C", "C"],
+        'New Reference': ["r1", "r2", "s1", "r2", "s1", "t1"],
+        'Mass Status': ["Unchanged", "Increased", "Unchanged", "Decreased", "Increased", "Unchanged"],
+        'Change Type': ["New", "Spring Changed", "New", "Unchanged", "Unchanged", "New"],
+    })
+    summary = summarize_history(changes)
+
+    expected = pd.DataFrame({
+        'Configuration': [0, 1, 2],
+        'Moteur': ["eb2", "dv5", "ep6"],
+        'Boite': ["bvm6", "eat8", "eat8"],
+        'Added In': ["B", "C", "D"],
+        'Reference Changed In': ["C", "", ""],
+        'Mass Changed In': ["C, D", "D", ""],
+        'Reference Changes': [1, 0, 0],
+        'Mass Changes': [2, 1, 0],
+        'Last Reference': ["r2", "s1", "t1"],
+    })
+    assert list(summary.columns) == ['Configuration'] + keys + list(expected.columns[3:])
+    pd.testing.assert_frame_equal(summary, expected, check_dtype=False)
@@ -0,0 +1,132 @@
+"""
+Equivalence tests of the PTA sheet reader backends against pd.read_excel.
+"""
+import datetime as dt
+import io
+import re
+import zipfile
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from config import UPLOAD_CONFIG
+from core.ingest import READERS
+
+
+#__TODO: Synthetic workbooks_________________________________
+def share_strings(data: bytes, keep_inline=()) -> bytes:
+    """
+    Move the inline strings of the PTA sheet to a shared string table, as
+    Excel writes them (openpyxl writes inline strings), except at keep_inline.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        members = {info.filename: archive.read(info) for info in archive.infolist()}
+    strings = []
+
+    def share(match):
+        if match.group(1) in keep_inline:
+            return match.group(0)
+        strings.append(match.group(3))
+        return f'<c r="{match.group(1)}"{match.group(2) or ""} t="s"><v>{len(strings) - 1}</v></c>'
+
+    sheet = "xl/worksheets/sheet1.xml"
+    members[sheet] = re.sub(
+        r'<c r="([A-Z]+\d+)"( s="\d+")? t="inlineStr"><is><t>(.*?)</t></is></c>',
+        share, members[sheet].decode()
+    ).encode()
+    items = "".join(f'<si><t xml:space="preserve">{text}</t></si>' for text in strings)
+    members["xl/sharedStrings.xml"] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{len(strings)}" uniqueCount="{len(strings)}">{items}</sst>'
+    ).encode()
+    members["[Content_Types].xml"] = members["[Content_Types].xml"].replace(b"</Types>", (
+        b'<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+        b'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>'
+    ))
+    members["xl/_rels/workbook.xml.rels"] = members["xl/_rels/workbook.xml.rels"].replace(
+        b"</Relationships>", (
+            b'<Relationship Id="rIdShared" Target="sharedStrings.xml" Type="http://schemas.'
+            b'openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/></Relationships>'
+        )
+    )
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return output.getvalue()
+
+
+def make_workbook(rows, formats=None, errors=(), texts=(), inline=()) -> bytes:
+    """
+    PTA workbook bytes: a header, the skipped description row, then rows.
+
+    Args:
+        rows: Data rows, None for an empty sheet row.
+        formats: Number format of some cells, {"A3": "yyyy/mm/dd"}.
+        errors: Cells written as error cells.
+        texts: Cells forced to plain text even if they look like an error code.
+        inline: Text cells kept as inline strings, the others are shared.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = UPLOAD_CONFIG["sheet_name"]
+    ws.append(["Key", "Label", "Flag", "Value", "When"])
+    ws.append(["key", "free text", "boolean", "number", "date"])
+    for row in rows:
+        ws.append(row if row is not None else [])
+    for ref, code in (formats or {}).items():
+        ws[ref].number_format = code
+    for ref in errors:
+        ws[ref].data_type = "e"
+    for ref in texts:
+        ws[ref].data_type = "s"
+    output = io.BytesIO()
+    wb.save(output)
+    return share_strings(output.getvalue(), inline)
+
+
+CASES = {
+    "shared_and_inline_strings": dict(
+        rows=[[1, "alpha", "x", 1.5], [2, "beta", None, 2.0], [3, " padded ", "X", 3]],
+        inline=["B3", "B5"],
+    ),
+    "booleans_and_errors": dict(
+        rows=[[1, True, False, "#DIV/0!"], [2, False, True, 4], [3, "#N/A", True, "#REF!"]],
+        errors=["D3", "B5"],
+    ),
+    "error_like_text": dict(
+        rows=[[1, "#REF!", None, 1], [2, "#DIV/0!", None, "#NAME?"], [3, "ok", None, 3]],
+        texts=["B3", "B4", "D4"],
+    ),
+    "dates": dict(
+        rows=[
+            [1, "a", None, 1, dt.datetime(2024, 1, 31)],
+            [2, "b", None, 2, dt.datetime(2024, 2, 29, 13, 45)],
+            [3, "c", None, 3, 45000],
+        ],
+        formats={"E3": "mm-dd-yy", "E4": "yyyy/mm/dd hh:mm", "E5": "d-mmm-yy"},
+    ),
+    "sparse_and_trailing_blanks": dict(
+        rows=[[1, None, None, 7], None, [None, "lonely"], [4, "d", None, None, None], None, None],
+        formats={"F9": "0.00", "A12": "0.00"},
+    ),
+}
+
+
+#__TODO: Readers match pd.read_excel_________________________________
+@pytest.mark.parametrize("columns", [None, ["Key", "Value", "When"]], ids=["all", "projected"])
+@pytest.mark.parametrize("case", sorted(CASES))
+@pytest.mark.parametrize("reader", ["xml", "openpyxl"])
+def test_reader_matches_read_excel(reader, case, columns):
+    data = make_workbook(**CASES[case])
+    expected = READERS["pandas"](data, columns)
+    pd.testing.assert_frame_equal(READERS[reader](data, columns), expected)
+
+
+def test_error_like_text_is_kept():
+    data = make_workbook(**CASES["error_like_text"])
+    df = READERS["openpyxl"](data)
+    assert df["Label"].tolist()[:2] == ["#REF!", "#DIV/0!"]
+    assert df["Value"].tolist()[1] == "#NAME?"